@@ -1,4 +1,5 @@
 """ChatGPT function calling based on function docstrings."""
+from .cache import InMemoryCache, ResponseCache
 from .conversation import Conversation
 from .exceptions import (
     BrokenSchemaError,
@@ -25,6 +26,8 @@ from .openai_types import FinalResponseMessage, FunctionCall, GenericMessage, Me
 from .parsers import ArgSchemaParser, defargparsers
 
 __all__ = [
+    "InMemoryCache",
+    "ResponseCache",
     "Conversation",
     "BrokenSchemaError",
     "CannotParseTypeError",
@@ -0,0 +1,60 @@
+"""Caches for raw OpenAI responses"""
+from __future__ import annotations
+from typing import Any, Protocol
+
+
+class ResponseCache(Protocol):
+    """A protocol for caches of raw OpenAI responses.
+
+    The keys are hashes of everything that was sent to OpenAI: the model, the
+    messages, the functions schema and the function call.
+    """
+
+    def lookup(self, key: str) -> Any | None:
+        """Look up a cached response
+
+        Args:
+            key (str): The hash of the request
+
+        Returns:
+            The cached response, or None if there is none
+        """
+
+    def update(self, key: str, response: Any) -> None:
+        """Store a response
+
+        Args:
+            key (str): The hash of the request
+            response (Any): The raw OpenAI response
+        """
+
+
+class InMemoryCache:
+    """A response cache that keeps the responses in a dictionary"""
+
+    def __init__(self) -> None:
+        self._responses: dict[str, Any] = {}
+
+    def lookup(self, key: str) -> Any | None:
+        """Look up a cached response
+
+        Args:
+            key (str): The hash of the request
+
+        Returns:
+            The cached response, or None if there is none
+        """
+        return self._responses.get(key)
+
+    def update(self, key: str, response: Any) -> None:
+        """Store a response
+
+        Args:
+            key (str): The hash of the request
+            response (Any): The raw OpenAI response
+        """
+        self._responses[key] = response
+
+    def clear(self) -> None:
+        """Remove all the cached responses"""
+        self._responses.clear()
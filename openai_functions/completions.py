@@ -0,0 +1,174 @@
+"""Helpers shared by the synchronous and asynchronous OpenAI requests"""
+from __future__ import annotations
+import hashlib
+import json
+import random
+import re
+from typing import Any, Callable, TYPE_CHECKING
+
+import openai
+import openai.error
+
+try:
+    # orjson is not a dependency, but serializes the requests several times faster
+    import orjson as _orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    _orjson = None
+
+if TYPE_CHECKING:
+    from .openai_types import NonFunctionMessageType
+
+
+# The errors worth retrying: rate limits and transient failures on OpenAI's side
+RETRIED_ERRORS = (
+    openai.error.RateLimitError,
+    openai.error.APIError,
+    openai.error.APIConnectionError,
+    openai.error.ServiceUnavailableError,
+    openai.error.Timeout,
+    openai.error.TryAgain,
+)
+_RETRY_TIME_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+_RETRY_TIME_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_MAX_BACKOFF = 60.0
+
+
+def parse_retry_time(wait_for: str) -> float:
+    """Parse the time returned by an x-ratelimit-reset-requests header
+
+    The time is made up of one or more parts, like "20ms", "1s" or "6m0s".
+
+    Args:
+        wait_for (str): The time
+
+    Raises:
+        ValueError: If the time is not in the expected format
+
+    Returns:
+        float: The time to the next reset
+    """
+    parts = _RETRY_TIME_PART.findall(wait_for)
+    if not parts or "".join(number + unit for number, unit in parts) != wait_for:
+        raise ValueError(f"Cannot parse the rate limit reset time {wait_for!r}")
+    return sum(float(number) * _RETRY_TIME_UNITS[unit] for number, unit in parts)
+
+
+def retry_time(error: openai.error.OpenAIError, attempt: int) -> float:
+    """Get the time to wait for before retrying a failed request
+
+    Rate limit replies say when the limit resets; for other errors, or if the
+    headers are missing, a random time of up to 2 ** attempt seconds, capped
+    at a minute, is used instead.
+
+    Args:
+        error (openai.error.OpenAIError): The error the request failed with
+        attempt (int): How many times the request has been retried already
+
+    Returns:
+        float: The time to wait for before retrying
+    """
+    try:
+        return _retry_time_from_headers(error.headers)
+    except (KeyError, ValueError, ZeroDivisionError):
+        return random.uniform(0, min(2.0**attempt, _MAX_BACKOFF))
+
+
+def _retry_time_from_headers(headers: dict[str, str]) -> float:
+    """Get the time returned by the headers of an 429 reply
+
+    Up to 10% of random jitter is added, so that conversations hitting the same
+    limit don't all retry at once.
+
+    Args:
+        headers (dict[str, str]): The headers of the reply
+
+    Returns:
+        float: The time to wait for before retrying
+    """
+    reset_time = parse_retry_time(headers["x-ratelimit-reset-requests"])
+    wait_for = reset_time / int(headers["x-ratelimit-limit-requests"])
+    return wait_for * (1 + random.random() * 0.1)
+
+
+def request_hash(request: dict[str, Any]) -> str:
+    """Hash a request, for looking it up in a response cache
+
+    Args:
+        request (dict[str, Any]): The arguments the request is made with
+
+    Returns:
+        str: The hash of the request, independent of the order of its keys
+    """
+    if _orjson is None:
+        serialized = json.dumps(request, sort_keys=True).encode()
+    else:
+        serialized = _orjson.dumps(request, option=_orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(serialized).hexdigest()
+
+
+class StreamedMessage:
+    """Assembles the chunks of a streamed OpenAI response into a message
+
+    Args:
+        on_function_name (Callable[[str], Any]): Called with the name of the called
+            function once all of it has arrived: with the first part of its
+            arguments, or when the response finishes
+    """
+
+    def __init__(self, on_function_name: Callable[[str], Any]) -> None:
+        self.on_function_name = on_function_name
+        self._content: list[str] = []
+        self._function_name = ""
+        self._arguments: list[str] = []
+        self._name_reported = False
+
+    def add_chunk(self, chunk: Any) -> None:
+        """Add a streamed chunk
+
+        Args:
+            chunk (Any): The raw chunk
+        """
+        if not chunk["choices"]:
+            return
+        choice = chunk["choices"][0]
+        delta = choice["delta"]
+        if delta.get("content"):
+            self._content.append(delta["content"])
+        function_call = delta.get("function_call")
+        if function_call:
+            # The name may be split across chunks, so it's only complete once the
+            # arguments start
+            self._function_name += function_call.get("name") or ""
+            arguments = function_call.get("arguments")
+            if arguments:
+                self._arguments.append(arguments)
+                self._report_name()
+        if choice.get("finish_reason"):
+            self._report_name()
+
+    def _report_name(self) -> None:
+        """Pass the function name to the callback, once"""
+        if self._function_name and not self._name_reported:
+            self._name_reported = True
+            self.on_function_name(self._function_name)
+
+    @property
+    def response(self) -> dict[str, Any]:
+        """Get the assembled response, shaped like a non-streamed raw response
+
+        Returns:
+            dict[str, Any]: The response
+        """
+        message: NonFunctionMessageType
+        if self._function_name:
+            message = {
+                "role": "assistant",
+                "content": None,
+                "function_call": {
+                    "name": self._function_name,
+                    "arguments": "".join(self._arguments),
+                },
+            }
+        else:
+            message = {"role": "assistant", "content": "".join(self._content)}
+        return {"choices": [{"message": message}]}
@@ -1,11 +1,16 @@
 """A module for running OpenAI functions"""
 from __future__ import annotations
+import asyncio
+import json
 import time
 from typing import Any, Callable, Literal, TYPE_CHECKING, overload
 
 import openai
 import openai.error
 
+from .completions import RETRIED_ERRORS, StreamedMessage, request_hash, retry_time
+from .exceptions import BrokenSchemaError, InvalidJsonError
+from .functions.functions import FunctionResult, RawFunctionResult
 from .functions.union import UnionSkillSet
 from .openai_types import (
     FinalResponseMessage,
@@ -19,8 +24,10 @@ from .openai_types import (
     is_final_response_message,
 )
 
-
 if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+    from .cache import ResponseCache
     from .json_type import JsonType
     from .openai_types import (
         FunctionCall,
@@ -29,10 +36,87 @@ if TYPE_CHECKING:
         OpenAiFunctionCallInput,
     )
     from .functions.functions import OpenAIFunction
-    from .functions.sets import FunctionResult, FunctionSet
+    from .functions.sets import FunctionSet
+
+
+def _as_message(message: GenericMessage | MessageType | str) -> GenericMessage:
+    """Wrap a raw message into a Message, leaving message objects as they are
+
+    Checks for the raw types rather than the GenericMessage protocol, as checking
+    a runtime protocol inspects every one of its attributes.
+
+    Args:
+        message (GenericMessage | MessageType | str): The message
+
+    Returns:
+        GenericMessage: The message object
+    """
+    if isinstance(message, (str, dict)):
+        return Message(message)
+    return message  # type: ignore
+
+
+class _AnswerQuestionsFunction:
+    """The function the AI answers a batch of questions through; see `ask_many`"""
+
+    name = "answer_questions"
+    save_return = True
+    serialize = True
+    remove_call = False
+    interpret_as_response = False
+
+    def __init__(self, question_count: int) -> None:
+        self.question_count = question_count
+
+    @property
+    def schema(self) -> dict[str, JsonType]:
+        """Get the schema for this function
+
+        Returns:
+            dict[str, JsonType]: The schema, requiring exactly one answer per question
+        """
+        return {
+            "name": self.name,
+            "description": "Give the answers to all of the questions, in order",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "answers": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "minItems": self.question_count,
+                        "maxItems": self.question_count,
+                    },
+                },
+                "required": ["answers"],
+            },
+        }
+
+    def __call__(self, arguments: dict[str, JsonType]) -> list[str]:
+        """Check and return the answers
+
+        Args:
+            arguments (dict[str, JsonType]): The arguments from OpenAI
+
+        Raises:
+            BrokenSchemaError: If there isn't exactly one string answer per question
+
+        Returns:
+            list[str]: The answers
+        """
+        answers = arguments.get("answers")
+        if (
+            not isinstance(answers, list)
+            or len(answers) != self.question_count
+            or not all(isinstance(answer, str) for answer in answers)
+        ):
+            raise BrokenSchemaError(arguments, self.schema)
+        return answers  # type: ignore
 
 
-class Conversation:
+# The asynchronous counterparts of the public methods push their count past
+# pylint's limit; they belong together, so there is nothing to split off
+class Conversation:  # pylint: disable=too-many-public-methods
     """A class representing a single conversation with the AI
 
     Contains the messages sent and received, and the skillset used.
@@ -43,11 +127,15 @@ class Conversation:
         skills: list[FunctionSet] | None = None,
         model: str = "gpt-3.5-turbo-0613",
         engine: str | None = None,
+        aiosession: ClientSession | None = None,
+        cache: ResponseCache | None = None,
     ) -> None:
         self.messages: list[GenericMessage] = []
         self.skills = UnionSkillSet(*(skills or []))
         self.model = model
         self.engine = engine
+        self.aiosession = aiosession
+        self.cache = cache
 
     @property
     def functions_schema(self) -> list[JsonType]:
@@ -72,10 +160,7 @@ class Conversation:
         Args:
             message (GenericMessage | MessageType | str): The message
         """
-        if isinstance(message, GenericMessage):
-            self._add_message(message)
-        else:
-            self._add_message(Message(message))
+        self._add_message(_as_message(message))
 
     def add_messages(self, messages: list[GenericMessage | MessageType]) -> None:
         """Add multiple messages to the end of the conversation
@@ -84,11 +169,40 @@ class Conversation:
             messages (list[GenericMessage | MessageType]): The messages
         """
         for message in messages:
-            self.add_message(message)
+            self._add_message(_as_message(message))
+
+    def _add_dict_message(
+        self, message: MessageType, replace_last: bool = False
+    ) -> GenericMessage:
+        """Add a message dictionary built by the conversation itself
+
+        Args:
+            message (MessageType): The message
+            replace_last (bool): Whether to replace the last message with it
+
+        Returns:
+            GenericMessage: The added message object
+        """
+        message_object = Message(message)
+        if replace_last:
+            self._replace_last_message(message_object)
+        else:
+            self._add_message(message_object)
+        return message_object
+
+    def _replace_last_message(self, message: GenericMessage) -> None:
+        """Replace the last message in place
+
+        Args:
+            message (GenericMessage): The new message
+        """
+        self.messages[-1] = message
 
     def pop_message(self, index: int = -1) -> GenericMessage:
         """Pop a message
 
+        Popping from anywhere but the end has to shift the messages after it.
+
         Args:
             index (int): The index. Defaults to -1.
 
@@ -101,93 +215,228 @@ class Conversation:
         """Fully clear the messages, but keep the skillset"""
         self.messages = []
 
+    @property
+    def message_dicts(self) -> list[MessageType]:
+        """Get the messages in the format OpenAI expects
+
+        Built from `messages` every time, so direct changes to it are always sent.
+
+        Returns:
+            list[MessageType]: The messages, as dictionaries
+        """
+        return [message.as_dict() for message in self.messages]
+
     @overload
     def _generate_message(
-        self, function_call: ForcedFunctionCall, retries: int | None = 1
+        self,
+        function_call: ForcedFunctionCall,
+        retries: int | None = 1,
+        stream: bool = False,
     ) -> IntermediateResponseMessageType:
         ...
 
     @overload
     def _generate_message(
-        self, function_call: Literal["none"], retries: int | None = 1
+        self,
+        function_call: Literal["none"],
+        retries: int | None = 1,
+        stream: bool = False,
     ) -> FinalResponseMessageType:
         ...
 
     @overload
     def _generate_message(
-        self, function_call: Literal["auto"] = "auto", retries: int | None = 1
+        self,
+        function_call: Literal["auto"] = "auto",
+        retries: int | None = 1,
+        stream: bool = False,
     ) -> NonFunctionMessageType:
         ...
 
     def _generate_message(
-        self, function_call: OpenAiFunctionCallInput = "auto", retries: int | None = 1
+        self,
+        function_call: OpenAiFunctionCallInput = "auto",
+        retries: int | None = 1,
+        stream: bool = False,
     ) -> NonFunctionMessageType:
         """Generate a response, retrying if necessary
 
         Args:
             function_call (OpenAiFunctionCallInput): The function call.
-            retries (int | None): The number of retries. Defaults to 4.
+            retries (int | None): The number of retries. Defaults to 1.
+                Will retry indefinitely if None.
+            stream (bool): Whether to stream the response
+
+        Raises:
+            openai.error.OpenAIError: If the retries run out, or the error is not
+                worth retrying
+
+        Returns:
+            NonFunctionMessageType: The response
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self._generate_raw_message(function_call, stream)
+            except RETRIED_ERRORS as error:
+                if attempt == retries:
+                    raise
+                time.sleep(retry_time(error, attempt))
+                attempt += 1
+            else:
+                return response["choices"][0]["message"]  # type: ignore
+
+    async def _agenerate_message(
+        self,
+        function_call: OpenAiFunctionCallInput = "auto",
+        retries: int | None = 1,
+        stream: bool = False,
+    ) -> NonFunctionMessageType:
+        """Generate a response asynchronously, retrying if necessary
+
+        Args:
+            function_call (OpenAiFunctionCallInput): The function call.
+            retries (int | None): The number of retries. Defaults to 1.
                 Will retry indefinitely if None.
+            stream (bool): Whether to stream the response
 
         Raises:
-            openai.error.RateLimitError: If the rate limit is exceeded
+            openai.error.OpenAIError: If the retries run out, or the error is not
+                worth retrying
 
         Returns:
             NonFunctionMessageType: The response
         """
-        if retries is None:
-            retries = -1
+        attempt = 0
         while True:
             try:
-                response = self._generate_raw_message(function_call)
-            except openai.error.RateLimitError as error:
-                if retries == 0:
+                response = await self._agenerate_raw_message(function_call, stream)
+            except RETRIED_ERRORS as error:
+                if attempt == retries:
                     raise
-                retries -= 1
-                time.sleep(self._retry_time_from_headers(error.headers))
+                await asyncio.sleep(retry_time(error, attempt))
+                attempt += 1
             else:
                 return response["choices"][0]["message"]  # type: ignore
 
-    def _parse_retry_time(self, wait_for: str) -> float:
-        """Parse the time returned by an x-ratelimit-reset-requests header
+    def _request(self, function_call: OpenAiFunctionCallInput) -> dict[str, Any]:
+        """Get the arguments of the next request to OpenAI
 
         Args:
-            wait_for (str): The time
+            function_call (OpenAiFunctionCallInput): The function call.
 
         Returns:
-            float: The time to the next reset
+            dict[str, Any]: Everything that would be sent to OpenAI
         """
-        return float(wait_for[:-1]) * {"s": 1, "m": 60, "h": 3600}[wait_for[-1]]
+        return {
+            "engine": self.engine,
+            "model": self.model,
+            "messages": self.message_dicts,
+            "functions": self.functions_schema,
+            "function_call": function_call,
+        }
 
-    def _retry_time_from_headers(self, headers: dict[str, str]) -> float:
-        """Get the time returned by the headers of an 429 reply
+    def _cached_response(self, request: dict[str, Any]) -> tuple[str | None, Any]:
+        """Look a request up in the response cache
 
         Args:
-            headers (dict[str, str]): The headers of the reply
+            request (dict[str, Any]): The request
 
         Returns:
-            float: The time to wait for before retrying
+            tuple[str | None, Any]: The cache key of the request, or None if there
+                is no cache, and the cached response, or None if there is none
         """
-        return self._parse_retry_time(headers["x-ratelimit-reset-requests"]) / int(
-            headers["x-ratelimit-limit-requests"]
-        )
+        if self.cache is None:
+            return None, None
+        key = request_hash(request)
+        return key, self.cache.lookup(key)
 
-    def _generate_raw_message(self, function_call: OpenAiFunctionCallInput) -> Any:
-        """Generate a raw OpenAI response
+    def _cache_response(self, key: str | None, response: Any) -> None:
+        """Save a response to the response cache, if there is one
+
+        Args:
+            key (str | None): The cache key, from `_cached_response`
+            response (Any): The raw OpenAI response
+        """
+        if self.cache is not None and key is not None:
+            self.cache.update(key, response)
+
+    def _generate_raw_message(
+        self, function_call: OpenAiFunctionCallInput, stream: bool = False
+    ) -> Any:
+        """Generate a raw OpenAI response, or reuse one from the cache
+
+        When streaming, the skills are asked to prewarm the called function as
+        soon as its name arrives, while its arguments are still being generated;
+        the chunks are then assembled into a regular response.
 
         Args:
             function_call (OpenAiFunctionCallInput): The function call.
+            stream (bool): Whether to stream the response
 
         Returns:
             The raw OpenAI response
         """
-        return openai.ChatCompletion.create(
-            engine=self.engine,
-            model=self.model,
-            messages=[message.as_dict() for message in self.messages],
-            functions=self.functions_schema,
-            function_call=function_call,
-        )
+        request = self._request(function_call)
+        key, response = self._cached_response(request)
+        if response is not None:
+            return response
+        response = openai.ChatCompletion.create(**request, stream=stream)
+        if stream:
+            streamed = StreamedMessage(self.skills.prewarm)
+            for chunk in response:
+                streamed.add_chunk(chunk)
+            response = streamed.response
+        self._cache_response(key, response)
+        return response
+
+    async def _agenerate_raw_message(
+        self, function_call: OpenAiFunctionCallInput, stream: bool = False
+    ) -> Any:
+        """Generate a raw OpenAI response asynchronously; see `_generate_raw_message`
+
+        If the conversation was given an aiohttp session, the request goes through
+        it, reusing its open connections; otherwise openai opens a new session for
+        every request.
+
+        Args:
+            function_call (OpenAiFunctionCallInput): The function call.
+            stream (bool): Whether to stream the response
+
+        Returns:
+            The raw OpenAI response
+        """
+        request = self._request(function_call)
+        key, response = self._cached_response(request)
+        if response is not None:
+            return response
+        token = openai.aiosession.set(self.aiosession) if self.aiosession else None
+        try:
+            response = await openai.ChatCompletion.acreate(**request, stream=stream)
+            if stream:
+                streamed = StreamedMessage(self.skills.prewarm)
+                async for chunk in response:
+                    streamed.add_chunk(chunk)
+                response = streamed.response
+        finally:
+            if token is not None:
+                openai.aiosession.reset(token)
+        self._cache_response(key, response)
+        return response
+
+    def _is_last_call_to(self, function_name: str) -> bool:
+        """Check whether the last message is a call to the given function
+
+        Args:
+            function_name (str): The function name
+
+        Returns:
+            bool: Whether the last message calls the function
+        """
+        if not self.messages:
+            return False
+        function_call = self.messages[-1].function_call
+        return function_call is not None and function_call["name"] == function_name
 
     def remove_function_call(self, function_name: str) -> None:
         """Remove a function call from the messages, if it is the last message
@@ -195,56 +444,67 @@ class Conversation:
         Args:
             function_name (str): The function name
         """
-        if (
-            self.messages[-1].function_call
-            and self.messages[-1].function_call["name"] == function_name
-        ):
+        if self._is_last_call_to(function_name):
             self.pop_message()
 
-    def _add_function_result(self, function_result: FunctionResult) -> bool:
+    def _add_function_result(
+        self, function_result: FunctionResult, replace_last: bool = False
+    ) -> bool:
         """Add a function execution result to the chat
 
         Args:
             function_result (FunctionResult): The function execution result
+            replace_last (bool): Whether the result replaces the last message
+                (the function call) instead of following it
 
         Returns:
             bool: Whether the function result was added
                 (whether save_return was True)
         """
-        if function_result.content is None:
+        content = function_result.content
+        if content is None:
+            if replace_last:
+                self.pop_message()
             return False
         if function_result.interpret_return_as_response:
-            self._add_function_result_as_response(function_result.content)
+            self._add_function_result_as_response(content, replace_last)
         else:
-            self._add_function_result_as_function_call(function_result)
+            self._add_function_result_as_function_call(
+                function_result.name, content, replace_last
+            )
         return True
 
-    def _add_function_result_as_response(self, function_result: str) -> None:
+    def _add_function_result_as_response(
+        self, function_result: str, replace_last: bool = False
+    ) -> None:
         """Add a function execution result to the chat as an assistant response
 
         Args:
             function_result (str): The function execution result
+            replace_last (bool): Whether to replace the last message with it
         """
         response: FinalResponseMessageType = {
             "role": "assistant",
             "content": function_result,
         }
-        self.add_message(response)
+        self._add_dict_message(response, replace_last)
 
     def _add_function_result_as_function_call(
-        self, function_result: FunctionResult
+        self, function_name: str, function_result: str, replace_last: bool = False
     ) -> None:
         """Add a function execution result to the chat as a function call
 
         Args:
-            function_result (FunctionResult): The function execution result
+            function_name (str): The name of the function that was run
+            function_result (str): The serialized function execution result
+            replace_last (bool): Whether to replace the last message with it
         """
         response: FunctionMessageType = {
             "role": "function",
-            "name": function_result.name,
-            "content": function_result.content,
+            "name": function_name,
+            "content": function_result,
         }
-        self.add_message(response)
+        self._add_dict_message(response, replace_last)
 
     def add_function_result(self, function_result: FunctionResult) -> bool:
         """Add a function execution result
@@ -260,9 +520,11 @@ class Conversation:
         Returns:
             bool: Whether the function result was added
         """
-        if function_result.remove_call:
-            self.remove_function_call(function_result.name)
-        return self._add_function_result(function_result)
+        return self._add_function_result(
+            function_result,
+            replace_last=function_result.remove_call
+            and self._is_last_call_to(function_result.name),
+        )
 
     def run_function_and_substitute(
         self,
@@ -300,8 +562,33 @@ class Conversation:
 
         return self.run_function_and_substitute(function_call)
 
+    async def arun_function_if_needed(self) -> bool:
+        """Run a function if the last message was a function call, without blocking
+        the event loop; see `run_function_if_needed`
+
+        The function runs in the event loop's default executor, so the functions
+        called by concurrently running conversations execute in parallel.
+
+        Returns:
+            bool: Whether the function result was added
+        """
+        if not self.messages:
+            return False
+
+        function_call = self.messages[-1].function_call
+        if not function_call:
+            return False
+
+        function_result = await asyncio.get_running_loop().run_in_executor(
+            None, self.skills.run_function, function_call
+        )
+        return self.add_function_result(function_result)
+
     def generate_message(
-        self, function_call: OpenAiFunctionCallInput = "auto", retries: int | None = 1
+        self,
+        function_call: OpenAiFunctionCallInput = "auto",
+        retries: int | None = 1,
+        stream: bool = False,
     ) -> GenericMessage:
         """Generate the next message. Will run a function if the last message
         was a function call and the function call is not being overridden;
@@ -311,6 +598,8 @@ class Conversation:
             function_call (OpenAiFunctionCallInput): The function call
             retries (int | None): The number of retries; if None, will retry
                 indefinitely
+            stream (bool): Whether to stream the response from OpenAI; the skills'
+                prewarm is then called as soon as a called function is named
 
         Returns:
             GenericMessage: The response
@@ -318,9 +607,10 @@ class Conversation:
         if function_call in ["auto", "none"] and self.run_function_if_needed():
             return self.messages[-1]
 
-        message: NonFunctionMessageType = self._generate_message(function_call, retries)
-        self.add_message(message)
-        return Message(message)
+        message: NonFunctionMessageType = self._generate_message(
+            function_call, retries, stream
+        )
+        return self._add_dict_message(message)
 
     def run_until_response(
         self, allow_function_calls: bool = True, retries: int | None = 1
@@ -344,6 +634,57 @@ class Conversation:
             if is_final_response_message(message):
                 return message
 
+    async def agenerate_message(
+        self,
+        function_call: OpenAiFunctionCallInput = "auto",
+        retries: int | None = 1,
+        stream: bool = False,
+    ) -> GenericMessage:
+        """Generate the next message asynchronously; see `generate_message`
+
+        Waiting for OpenAI does not block the event loop, so several conversations
+        can be run concurrently.
+
+        Args:
+            function_call (OpenAiFunctionCallInput): The function call
+            retries (int | None): The number of retries; if None, will retry
+                indefinitely
+            stream (bool): Whether to stream the response from OpenAI
+
+        Returns:
+            GenericMessage: The response
+        """
+        if function_call in ["auto", "none"] and await self.arun_function_if_needed():
+            return self.messages[-1]
+
+        message: NonFunctionMessageType = await self._agenerate_message(
+            function_call, retries, stream
+        )
+        return self._add_dict_message(message)
+
+    async def arun_until_response(
+        self, allow_function_calls: bool = True, retries: int | None = 1
+    ) -> FinalResponseMessage:
+        """Run functions and query the AI asynchronously until a response is
+        generated; see `run_until_response`
+
+        Args:
+            allow_function_calls (bool): Whether to allow the AI to call functions
+            retries (int | None): The number of retries; if None, will retry
+                indefinitely
+
+        Returns:
+            FinalResponseMessage: The final response, either from the AI or a function
+                that has interpret_as_response set to True
+        """
+        while True:
+            message = await self.agenerate_message(
+                function_call="auto" if allow_function_calls else "none",
+                retries=retries,
+            )
+            if is_final_response_message(message):
+                return message
+
     @overload
     def add_function(self, function: OpenAIFunction) -> OpenAIFunction:
         ...
@@ -449,6 +790,103 @@ class Conversation:
         self.add_message(question)
         return self.run_until_response(retries=retries).content
 
+    async def aask(self, question: str, retries: int | None = 1) -> str:
+        """Ask the AI a question asynchronously; see `ask`
+
+        Args:
+            question (str): The question
+            retries (int | None): The number of retries; if None, will retry
+                indefinitely
+
+        Returns:
+            str: The answer to the question
+        """
+        self.add_message(question)
+        return (await self.arun_until_response(retries=retries)).content
+
+    def ask_many(
+        self, questions: list[str], batch_size: int = 20, retries: int | None = 1
+    ) -> list[str]:
+        """Ask the AI several independent questions, answering a batch of them
+        per request
+
+        Each batch is sent as a single message with numbered questions, and the AI
+        is made to return the answers through a function call, so they don't have
+        to be parsed from free text.
+
+        Args:
+            questions (list[str]): The questions
+            batch_size (int): The number of questions to send in one request
+            retries (int | None): The number of retries; if None, will retry
+                indefinitely
+
+        Raises:
+            ValueError: If a function named "answer_questions" is already available
+            BrokenSchemaError: If the AI didn't answer every question of a batch
+            InvalidJsonError: If the AI returned invalid JSON
+
+        Returns:
+            list[str]: The answers, in the same order as the questions
+        """
+        if any(
+            schema["name"] == _AnswerQuestionsFunction.name  # type: ignore
+            for schema in self.functions_schema
+        ):
+            raise ValueError(
+                f"A function named {_AnswerQuestionsFunction.name!r} is already "
+                "available, so ask_many can't add its own"
+            )
+        answers: list[str] = []
+        for start in range(0, len(questions), batch_size):
+            answers += self._ask_batch(questions[start : start + batch_size], retries)
+        return answers
+
+    def _ask_batch(self, questions: list[str], retries: int | None) -> list[str]:
+        """Ask a batch of questions; see `ask_many`
+
+        Args:
+            questions (list[str]): The questions
+            retries (int | None): The number of retries
+
+        Raises:
+            BrokenSchemaError: If the AI didn't answer every question
+            InvalidJsonError: If the AI returned invalid JSON
+
+        Returns:
+            list[str]: The answers
+        """
+        answer_function = _AnswerQuestionsFunction(len(questions))
+        message_count = len(self.messages)
+        self.add_message(
+            f"Answer each of the following {len(questions)} questions, in order:\n\n"
+            + "\n".join(
+                f"Q{number}: {question}"
+                for number, question in enumerate(questions, start=1)
+            )
+        )
+        self.add_function(answer_function)
+        try:
+            response: FunctionCallMessage
+            response = self.generate_message(
+                {"name": answer_function.name}, retries=retries
+            )  # type: ignore
+            arguments = response.function_call["arguments"]
+            try:
+                answers = answer_function(json.loads(arguments))
+            except json.JSONDecodeError as error:
+                raise InvalidJsonError(arguments) from error
+        except BaseException:
+            # Drop the question and the call to the function removed below, so
+            # that the conversation can go on without them
+            del self.messages[message_count:]
+            raise
+        finally:
+            self.remove_function(answer_function)
+        self.add_function_result(
+            FunctionResult(answer_function.name, RawFunctionResult(answers))
+        )
+        return answers
+
     def add_skill(self, skill: FunctionSet) -> None:
         """Add a skill to those available to the AI
 
@@ -479,3 +917,27 @@ class Conversation:
             {"name": function}, retries=retries
         )  # type: ignore
         return self.skills(response.function_call)
+
+    async def arun(
+        self, function: str, prompt: str | None = None, retries: int | None = 1
+    ) -> Any:
+        """Run a specified function asynchronously and return the raw function
+        result; see `run`
+
+        Args:
+            function (str): The function to run
+            prompt (str | None): The prompt to use
+            retries (int | None): The number of retries; if None, will retry
+                indefinitely
+
+        Returns:
+            The raw function result
+        """
+        if prompt is not None:
+            self.add_message(prompt)
+        # We can do type: ignore as we know we're forcing a function call
+        response: FunctionCallMessage
+        response = await self.agenerate_message(
+            {"name": function}, retries=retries
+        )  # type: ignore
+        return self.skills(response.function_call)
@@ -1,13 +1,37 @@
 """The exceptions associated with function handling."""
 from __future__ import annotations
+from functools import cached_property
+import reprlib
 from typing import Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .json_type import JsonType
 
+# Bounds the size of the values shown in error messages; OpenAI responses and
+# function results can be arbitrarily large
+_short_repr = reprlib.Repr()
+_short_repr.maxlist = _short_repr.maxdict = 10
+_short_repr.maxstring = _short_repr.maxother = 200
+
 
 class OpenAIFunctionsError(Exception):
-    """The base exception for all OpenAI Functions errors."""
+    """The base exception for all OpenAI Functions errors.
+
+    The messages are only built when the exception is converted to a string, so
+    errors that are caught and handled don't pay for formatting them.
+    """
+
+    def __str__(self) -> str:
+        return self._message
+
+    @cached_property
+    def _message(self) -> str:
+        """Build the message of the exception
+
+        Returns:
+            str: The message
+        """
+        return super().__str__()
 
 
 class FunctionNotFoundError(OpenAIFunctionsError):
@@ -23,9 +47,13 @@ class FunctionNotFoundError(OpenAIFunctionsError):
         Args:
             function_name (str): The name of the function that was not found
         """
-        super().__init__(f"Function {function_name} not found.")
+        super().__init__(function_name)
         self.function_name = function_name
 
+    @cached_property
+    def _message(self) -> str:
+        return f"Function {self.function_name} not found."
+
 
 class CannotParseTypeError(OpenAIFunctionsError):
     """This type of the argument could not be parsed.
@@ -40,9 +68,13 @@ class CannotParseTypeError(OpenAIFunctionsError):
         Args:
             argtype (Any): The type that could not be parsed
         """
-        super().__init__(f"Cannot parse type {argtype}")
+        super().__init__(argtype)
         self.argtype = argtype
 
+    @cached_property
+    def _message(self) -> str:
+        return f"Cannot parse type {self.argtype}"
+
 
 class NonSerializableOutputError(OpenAIFunctionsError):
     """The function returned a non-serializable output.
@@ -57,11 +89,15 @@ class NonSerializableOutputError(OpenAIFunctionsError):
         Args:
             result (Any): The result that was not serializable
         """
-        super().__init__(
-            f"The result {result} is not JSON-serializable. "
+        super().__init__(result)
+        self.result = result
+
+    @cached_property
+    def _message(self) -> str:
+        return (
+            f"The result {_short_repr.repr(self.result)} is not JSON-serializable. "
             "Set serialize=False to use str() instead."
         )
-        self.result = result
 
 
 class InvalidJsonError(OpenAIFunctionsError):
@@ -77,11 +113,13 @@ class InvalidJsonError(OpenAIFunctionsError):
         Args:
             response (str): The response that was not valid JSON
         """
-        super().__init__(
-            f"OpenAI returned invalid (perhaps incomplete) JSON: {response}"
-        )
+        super().__init__(response)
         self.response = response
 
+    @cached_property
+    def _message(self) -> str:
+        return f"OpenAI returned invalid (perhaps incomplete) JSON: {self.response}"
+
 
 class BrokenSchemaError(OpenAIFunctionsError):
     """The OpenAI response did not match the schema.
@@ -98,9 +136,14 @@ class BrokenSchemaError(OpenAIFunctionsError):
             response (JsonType): The response that did not match the schema
             schema (JsonType): The schema that the response did not match
         """
-        super().__init__(
-            "OpenAI returned a response that did not match the schema: "
-            f"{response!r} does not match {schema}"
-        )
+        super().__init__(response, schema)
         self.response = response
         self.schema = schema
+
+    @cached_property
+    def _message(self) -> str:
+        return (
+            "OpenAI returned a response that did not match the schema: "
+            f"{_short_repr.repr(self.response)} does not match "
+            f"{_short_repr.repr(self.schema)}"
+        )
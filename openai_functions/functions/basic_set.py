@@ -1,17 +1,47 @@
 """A module for running OpenAI functions"""
 from __future__ import annotations
 import json
+import operator
 from typing import TYPE_CHECKING
 
 from ..exceptions import FunctionNotFoundError, InvalidJsonError
 from .functions import FunctionResult, OpenAIFunction, RawFunctionResult
 from .sets import MutableFunctionSet
 
+try:
+    # orjson is not a dependency, but parses large arguments several times faster;
+    # its errors subclass json.JSONDecodeError, so they are handled the same way
+    from orjson import loads as _loads_json  # type: ignore
+except ImportError:  # pragma: no cover
+    from json import loads as _loads_json  # type: ignore
+
 if TYPE_CHECKING:
     from ..json_type import JsonType
     from ..openai_types import FunctionCall
 
 
+def _same_functions(
+    functions: list[OpenAIFunction], built_from: list[OpenAIFunction]
+) -> bool:
+    """Check whether a list holds the very same functions as a snapshot of it
+
+    This is linear in the number of functions, but only compares identities, in
+    C, without looking at any function's name or schema. It is what lets direct
+    changes to `BasicFunctionSet.functions` be noticed, as the list is public and
+    can be edited in place.
+
+    Args:
+        functions (list[OpenAIFunction]): The current functions
+        built_from (list[OpenAIFunction]): The snapshot
+
+    Returns:
+        bool: Whether the functions are identical and in the same order
+    """
+    return len(functions) == len(built_from) and all(
+        map(operator.is_, functions, built_from)
+    )
+
+
 class BasicFunctionSet(MutableFunctionSet):
     """A skill set - a set of OpenAIFunction objects ready to be called.
     Inherited from `MutableFunctionSet`, therefore you can add and remove functions
@@ -25,16 +55,53 @@ class BasicFunctionSet(MutableFunctionSet):
         self,
         functions: list[OpenAIFunction] | None = None,
     ) -> None:
-        self.functions = functions or []
+        self.functions = list(functions or [])
+        # The name index and the schemas, and the functions they were built from
+        self._indexed_functions: list[OpenAIFunction] = []
+        self._functions_by_name: dict[str, OpenAIFunction] = {}
+        self._schema_functions: list[OpenAIFunction] = []
+        self._functions_schema: list[JsonType] = []
 
     @property
     def functions_schema(self) -> list[JsonType]:
         """Get the functions schema, in the format OpenAI expects
 
+        Every function's schema is only built once: the list is reused for as
+        long as `functions` holds the same functions, and when it changes only the
+        schemas of the new functions are built.
+
         Returns:
             JsonType: The schema of all the available functions
         """
-        return [function.schema for function in self.functions]
+        if not _same_functions(self.functions, self._schema_functions):
+            built = {
+                id(function): schema
+                for function, schema in zip(
+                    self._schema_functions, self._functions_schema
+                )
+            }
+            self._functions_schema = [
+                built[id(function)] if id(function) in built else function.schema
+                for function in self.functions
+            ]
+            self._schema_functions = list(self.functions)
+        return self._functions_schema
+
+    def _function_index(self) -> dict[str, OpenAIFunction]:
+        """Get the functions by name, rebuilt if `functions` has changed
+
+        Checking for changes compares `functions` against the list the index was
+        built from, one identity check per function; see `_same_functions`.
+
+        Returns:
+            dict[str, OpenAIFunction]: The first function of each name
+        """
+        if not _same_functions(self.functions, self._indexed_functions):
+            self._functions_by_name = {}
+            for function in self.functions:
+                self._functions_by_name.setdefault(function.name, function)
+            self._indexed_functions = list(self.functions)
+        return self._functions_by_name
 
     def run_function(self, input_data: FunctionCall) -> FunctionResult:
         """Run the function
@@ -51,7 +118,7 @@ class BasicFunctionSet(MutableFunctionSet):
         """
         function = self.find_function(input_data["name"])
         try:
-            arguments = json.loads(input_data["arguments"])
+            arguments = _loads_json(input_data["arguments"])
         except json.decoder.JSONDecodeError as err:
             raise InvalidJsonError(input_data["arguments"]) from err
         result = self.get_function_result(function, arguments)
@@ -71,10 +138,10 @@ class BasicFunctionSet(MutableFunctionSet):
         Raises:
             FunctionNotFoundError: If the function is not found
         """
-        for function in self.functions:
-            if function.name == function_name:
-                return function
-        raise FunctionNotFoundError(function_name)
+        function = self._function_index().get(function_name)
+        if function is None:
+            raise FunctionNotFoundError(function_name)
+        return function
 
     def get_function_result(
         self, function: OpenAIFunction, arguments: dict[str, JsonType]
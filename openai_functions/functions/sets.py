@@ -31,6 +31,17 @@ class FunctionSet(ABC):
             FunctionNotFoundError: If the function is not found
         """
 
+    def prewarm(self, function_name: str) -> None:
+        """Prepare to run a function the AI has started calling
+
+        Called while a streamed response is still being generated, as soon as the
+        name of the called function is known; override it to, for example, open
+        the connections the function will need. Does nothing by default.
+
+        Args:
+            function_name (str): The name of the function being called
+        """
+
     def __call__(self, input_data: FunctionCall) -> JsonType:
         """Run the function with the given input data
 
@@ -112,21 +123,30 @@ class MutableFunctionSet(FunctionSet):
         Returns:
             Callable[[Callable[..., Any]], Callable[..., Any]]: A decorator
             Callable[..., Any]: The original function
+
+        Raises:
+            CannotParseTypeError: If an argument of a plain function has a type
+                that cannot be parsed
         """
-        if isinstance(function, OpenAIFunction):
+        # FunctionWrapper is checked for first: an isinstance check against a
+        # concrete class is cheap, while checking against the runtime-checkable
+        # protocol has to look up every one of its members
+        if isinstance(function, (FunctionWrapper, OpenAIFunction)):
             self._add_function(function)
             return function
         if callable(function):
-            self._add_function(
-                FunctionWrapper(
-                    function,
-                    WrapperConfig(
-                        None, save_return, serialize, remove_call, interpret_as_response
-                    ),
-                    name=name,
-                    description=description,
-                )
+            wrapper = FunctionWrapper(
+                function,
+                WrapperConfig(
+                    None, save_return, serialize, remove_call, interpret_as_response
+                ),
+                name=name,
+                description=description,
             )
+            # Build the schema now rather than on the first request, which also
+            # reports unsupported argument types as soon as the function is added
+            wrapper.schema  # pylint: disable=pointless-statement
+            self._add_function(wrapper)
             return function
 
         return partial(
@@ -154,7 +174,7 @@ class MutableFunctionSet(FunctionSet):
         if isinstance(function, str):
             self._remove_function(function)
             return
-        if isinstance(function, OpenAIFunction):
+        if isinstance(function, (FunctionWrapper, OpenAIFunction)):
             self._remove_function(function.name)
             return
         self._remove_function(function.__name__)
@@ -32,6 +32,7 @@ class TogglableSet(BasicFunctionSet):
         self.enabled = False
         self.enable_function_name = enable_function_name
         self.enable_function_description = enable_function_description
+        self._disabled_schema: list[JsonType] = [self._enable_function_schema]
 
     def enable(self) -> None:
         """Enable the function set."""
@@ -59,12 +60,15 @@ class TogglableSet(BasicFunctionSet):
     def functions_schema(self) -> list[JsonType]:
         """Get the functions schema, in the format OpenAI expects
 
+        While the set is disabled, the same list holding the enable function's
+        schema, built once on initialization, is returned every time.
+
         Returns:
             JsonType: The schema of all the available functions
         """
         if self.enabled:
             return super().functions_schema
-        return [self._enable_function_schema]
+        return self._disabled_schema
 
     def run_function(self, input_data: FunctionCall) -> FunctionResult:
         """Run the function, enabling the set if the enable function is called.
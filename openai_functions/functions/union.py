@@ -1,6 +1,6 @@
 """A function set that's a union of other function sets."""
 from __future__ import annotations
-import contextlib
+from itertools import chain
 from typing import TYPE_CHECKING
 
 from ..exceptions import FunctionNotFoundError
@@ -19,6 +19,10 @@ class UnionSkillSet(BasicFunctionSet):
     def __init__(self, *sets: FunctionSet) -> None:
         self.sets = list(sets)
         super().__init__()
+        self._combined_from: list[list[JsonType]] = []
+        self._combined_schema: list[JsonType] = []
+        # Which child set advertises each function, rebuilt with the schema
+        self._sets_by_function: dict[str, FunctionSet] = {}
 
     @property
     def functions_schema(self) -> list[JsonType]:
@@ -27,13 +31,41 @@ class UnionSkillSet(BasicFunctionSet):
         Returns:
             list[JsonType]: The combined functions schema
         """
-        return super().functions_schema + sum(
-            (function_set.functions_schema for function_set in self.sets), []
-        )
+        return self._update_combined_schema()
+
+    def _update_combined_schema(self) -> list[JsonType]:
+        """Rebuild the combined functions schema if any of the sets changed
+
+        The combined list is reused for as long as every set returns the same
+        schema list object as before; sets that cache their schema, like
+        BasicFunctionSet, only return a new one when their functions change.
+
+        Returns:
+            list[JsonType]: The combined functions schema
+        """
+        parts = [super().functions_schema] + [
+            function_set.functions_schema for function_set in self.sets
+        ]
+        if len(parts) != len(self._combined_from) or any(
+            part is not previous for part, previous in zip(parts, self._combined_from)
+        ):
+            self._combined_schema = list(chain.from_iterable(parts))
+            self._combined_from = parts
+            self._sets_by_function = {}
+            for function_set, part in zip(self.sets, parts[1:]):
+                for schema in part:
+                    self._sets_by_function.setdefault(
+                        schema["name"], function_set  # type: ignore
+                    )
+        return self._combined_schema
 
     def run_function(self, input_data: FunctionCall) -> FunctionResult:
         """Run the function
 
+        The set to run the function in is looked up by name among the functions
+        the sets currently advertise; only unknown names are offered to every
+        set in turn, for sets that run functions missing from their schema.
+
         Args:
             input_data (FunctionCall): The function call
 
@@ -43,11 +75,28 @@ class UnionSkillSet(BasicFunctionSet):
         Raises:
             FunctionNotFoundError: If the function is not found
         """
-        for function_set in self.sets:
-            with contextlib.suppress(FunctionNotFoundError):
-                return function_set.run_function(input_data)
+        name = input_data["name"]
+        self._update_combined_schema()
+        target = self._sets_by_function.get(name)
+        if target is not None:
+            return target.run_function(input_data)
+        if name not in self._function_index():
+            for function_set in self.sets:
+                try:
+                    return function_set.run_function(input_data)
+                except FunctionNotFoundError:
+                    continue
         return super().run_function(input_data)
 
+    def prewarm(self, function_name: str) -> None:
+        """Let every set prepare to run a function the AI has started calling
+
+        Args:
+            function_name (str): The name of the function being called
+        """
+        for function_set in self.sets:
+            function_set.prewarm(function_name)
+
     def add_skill(self, skill: FunctionSet) -> None:
         """Add a skill
 
@@ -2,18 +2,19 @@
 from __future__ import annotations
 from dataclasses import dataclass
 import inspect
-from typing import Any, Callable, OrderedDict, TYPE_CHECKING, Type
+from typing import Any, Callable, TYPE_CHECKING, Type
 
-from docstring_parser import Docstring, parse
-
-from ..exceptions import BrokenSchemaError, CannotParseTypeError
+from ..exceptions import BrokenSchemaError
 from ..parsers import ArgSchemaParser, defargparsers
+from ..parsers.abc import find_parser
 
 if TYPE_CHECKING:
+    from docstring_parser import Docstring
+
     from ..json_type import JsonType
 
 
-@dataclass
+@dataclass(frozen=True)
 class WrapperConfig:
     """Configuration for a FunctionWrapper, one that specifies the parsers for the
     arguments and the treatment of the return value.
@@ -30,6 +31,8 @@ class WrapperConfig:
         interpret_as_response (bool): Whether to interpret the return value as a
             response from the agent directly, or to base the response on the
             return value
+
+    Configurations are immutable, so a single one can be shared by many wrappers.
     """
 
     parsers: list[Type[ArgSchemaParser]] | None = None
@@ -39,6 +42,9 @@ class WrapperConfig:
     interpret_as_response: bool = False
 
 
+_DEFAULT_CONFIG = WrapperConfig()
+
+
 class FunctionWrapper:
     """Wraps a function for jsonschema io
 
@@ -52,6 +58,19 @@ class FunctionWrapper:
         config (WrapperConfig | None, optional): The configuration for the wrapper.
     """
 
+    __slots__ = (
+        "func",
+        "config",
+        "_name",
+        "_description",
+        "_argument_parsers",
+        "_value_parsers",
+        "_schema",
+        "_signature",
+        "_parsed_docs",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         func: Callable[..., Any],
@@ -68,9 +87,14 @@ class FunctionWrapper:
             description (str | None): The description override for the function.
         """
         self.func = func
-        self.config = config or WrapperConfig()
+        self.config = config or _DEFAULT_CONFIG
         self._name = name
         self._description = description
+        self._argument_parsers: dict[str, ArgSchemaParser] | None = None
+        self._value_parsers: dict[str, Callable[[JsonType], Any]] | None = None
+        self._schema: dict[str, JsonType] | None = None
+        self._signature: inspect.Signature | None = None
+        self._parsed_docs: Docstring | None = None
 
     @property
     def parsers(self) -> list[Type[ArgSchemaParser]]:
@@ -120,16 +144,46 @@ class FunctionWrapper:
         return self.config.interpret_as_response
 
     @property
-    def argument_parsers(self) -> OrderedDict[str, ArgSchemaParser]:
+    def signature(self) -> inspect.Signature:
+        """Get the signature of the wrapped function, inspected once
+
+        Returns:
+            inspect.Signature: The signature
+        """
+        if self._signature is None:
+            self._signature = inspect.signature(self.func)
+        return self._signature
+
+    @property
+    def argument_parsers(self) -> dict[str, ArgSchemaParser]:
         """Get the argument parsers for this function
 
+        The parsers are resolved once, on first access, and reused afterwards.
+
+        Returns:
+            dict[str, ArgSchemaParser]: The argument parsers, in signature order
+        """
+        if self._argument_parsers is None:
+            self._argument_parsers = {
+                name: self.parse_argument(argument)
+                for name, argument in self.signature.parameters.items()
+            }
+        return self._argument_parsers
+
+    @property
+    def value_parsers(self) -> dict[str, Callable[[JsonType], Any]]:
+        """Get the bound value parsing functions for the arguments of this function
+
         Returns:
-            OrderedDict[str, ArgSchemaParser]: The argument parsers
+            dict[str, Callable[[JsonType], Any]]: The `parse_value` method of
+                each argument parser, by argument name
         """
-        return OrderedDict(
-            (name, self.parse_argument(argument))
-            for name, argument in inspect.signature(self.func).parameters.items()
-        )
+        if self._value_parsers is None:
+            self._value_parsers = {
+                name: parser.parse_value
+                for name, parser in self.argument_parsers.items()
+            }
+        return self._value_parsers
 
     @property
     def required_arguments(self) -> JsonType:
@@ -140,7 +194,7 @@ class FunctionWrapper:
         """
         return [
             name
-            for name, argument in inspect.signature(self.func).parameters.items()
+            for name, argument in self.signature.parameters.items()
             if argument.default is argument.empty
         ]
 
@@ -151,26 +205,30 @@ class FunctionWrapper:
         Returns:
             JsonType: The arguments schema
         """
-        return {
-            name: {
-                **parser.argument_schema,
-                **(
-                    {"description": self.arg_docs.get(name)}
-                    if name in self.arg_docs
-                    else {}
-                ),
-            }
-            for name, parser in self.argument_parsers.items()
-        }
+        arg_docs = self.arg_docs
+        arguments_schema: dict[str, JsonType] = {}
+        for name, parser in self.argument_parsers.items():
+            argument_schema = parser.argument_schema.copy()
+            description = arg_docs.get(name)
+            if description is not None:
+                argument_schema["description"] = description
+            arguments_schema[name] = argument_schema
+        return arguments_schema
 
     @property
     def parsed_docs(self) -> Docstring:
-        """Get the parsed docs for this function
+        """Get the parsed docs for this function, parsed once
 
         Returns:
             Docstring: The parsed docs
         """
-        return parse(self.func.__doc__ or "")
+        if self._parsed_docs is None:
+            # Imported on first use, as docstring_parser is slow to import
+            # pylint: disable-next=import-outside-toplevel
+            from docstring_parser import parse
+
+            self._parsed_docs = parse(self.func.__doc__ or "")
+        return self._parsed_docs
 
     @property
     def arg_docs(self) -> dict[str, str]:
@@ -198,6 +256,18 @@ class FunctionWrapper:
     def schema(self) -> dict[str, JsonType]:
         """Get the schema for this function
 
+        The schema is generated on first access and reused afterwards.
+
+        Returns:
+            dict[str, JsonType]: The schema
+        """
+        if self._schema is None:
+            self._schema = self._generate_schema()
+        return self._schema
+
+    def _generate_schema(self) -> dict[str, JsonType]:
+        """Generate the schema for this function
+
         Returns:
             dict[str, JsonType]: The schema
         """
@@ -209,10 +279,9 @@ class FunctionWrapper:
                 "required": self.required_arguments,
             },
         }
-        if self.parsed_docs.short_description or self._description:
-            schema["description"] = (
-                self.parsed_docs.short_description or self._description
-            )
+        description = self.parsed_docs.short_description or self._description
+        if description:
+            schema["description"] = description
         return schema
 
     def parse_argument(self, argument: inspect.Parameter) -> ArgSchemaParser:
@@ -230,12 +299,10 @@ class FunctionWrapper:
         # The reasoning behind not using pydantic is OpenAI's apparent inability to
         # parse JSON Schemas with $ref's in them - or at least, that's what I've
         # gathered from the error messages.
-        for parser in self.parsers:
-            if parser.can_parse(argument.annotation):
-                return parser(argument.annotation, self.parsers)
-        raise CannotParseTypeError(argument.annotation)
+        parsers = self.parsers
+        return find_parser(argument.annotation, parsers)(argument.annotation, parsers)
 
-    def parse_arguments(self, arguments: dict[str, JsonType]) -> OrderedDict[str, Any]:
+    def parse_arguments(self, arguments: dict[str, JsonType]) -> dict[str, Any]:
         """Parse arguments
 
         Args:
@@ -245,16 +312,18 @@ class FunctionWrapper:
             BrokenSchemaError: If the arguments do not match the schema
 
         Returns:
-            OrderedDict[str, Any]: The parsed arguments
+            dict[str, Any]: The parsed arguments, in the order they were given
         """
-        argument_parsers = self.argument_parsers
-        if not all(name in arguments for name in argument_parsers):
+        value_parsers = self.value_parsers
+        if not arguments and not value_parsers:
+            return {}
+        # A subset check on the key views runs entirely in C
+        if not value_parsers.keys() <= arguments.keys():
             raise BrokenSchemaError(arguments, self.arguments_schema)
         try:
-            return OrderedDict(
-                (name, argument_parsers[name].parse_value(value))
-                for name, value in arguments.items()
-            )
+            return {
+                name: value_parsers[name](value) for name, value in arguments.items()
+            }
         except KeyError as err:
             raise BrokenSchemaError(arguments, self.arguments_schema) from err
 
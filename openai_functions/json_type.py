@@ -1,4 +1,12 @@
 """Type definitions for JSON data."""
 from __future__ import annotations
+from typing import Any, TYPE_CHECKING
 
-JsonType = int | float | str | bool | list["JsonType"] | dict[str, "JsonType"] | None
+if TYPE_CHECKING:
+    JsonType = (
+        int | float | str | bool | list["JsonType"] | dict[str, "JsonType"] | None
+    )
+else:
+    # The recursive union is only needed by type checkers; building it at runtime
+    # is wasted work on import, and fails on Python < 3.10
+    JsonType = Any
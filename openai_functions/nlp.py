@@ -1,13 +1,20 @@
 """A module for running OpenAI functions"""
 from __future__ import annotations
+import asyncio
 from dataclasses import dataclass
 from functools import partial
-from typing import Callable, Generic, Protocol, TypeVar, overload
+from typing import Callable, Generic, Protocol, TYPE_CHECKING, TypeVar, overload
 from typing_extensions import ParamSpec
 
+import openai
+
 from .conversation import Conversation
 from .functions.wrapper import FunctionWrapper, WrapperConfig
 
+if TYPE_CHECKING:
+    from .cache import ResponseCache
+    from .openai_types import MessageType
+
 
 Param = ParamSpec("Param")
 Return = TypeVar("Return")
@@ -39,9 +46,12 @@ class DecoratorProtocol(
         ...
 
 
-@dataclass
+@dataclass(frozen=True)
 class NLPWrapperConfig:
-    """A configuration for the nlp decorator"""
+    """A configuration for the nlp decorator
+
+    Immutable, as the wrapper prepares its system message from it only once.
+    """
 
     name: str | None = None
     description: str | None = None
@@ -50,6 +60,7 @@ class NLPWrapperConfig:
     model: str = "gpt-3.5-turbo-0613"
     engine: str | None = None
     system_prompt: str | None = None
+    cache: ResponseCache | None = None
 
 
 class Wrapper(Generic[Param, Return]):
@@ -62,28 +73,58 @@ class Wrapper(Generic[Param, Return]):
     ) -> None:
         self.origin = origin
         self.config = config
-        self.conversation = Conversation(model=config.model, engine=config.engine)
         self.openai_function = FunctionWrapper(
             self.origin,
             WrapperConfig(serialize=config.serialize),
             name=config.name,
             description=config.description,
         )
-        self.conversation.add_function(self.openai_function)
+        # Built once and shared by every run, so each request starts with the
+        # very same prefix
+        self._system_message: MessageType | None = (
+            None
+            if config.system_prompt is None
+            else {"role": "system", "content": config.system_prompt}
+        )
+        self._conversation: Conversation | None = None
 
     def __call__(self, *args: Param.args, **kwds: Param.kwargs) -> Return:
         return self.origin(*args, **kwds)
 
-    def _initialize_conversation(self) -> None:
-        """Initialize the conversation"""
-        self.conversation.clear_messages()
-        if self.config.system_prompt is not None:
-            self.conversation.add_message(
-                {
-                    "role": "system",
-                    "content": self.config.system_prompt,
-                }
-            )
+    @property
+    def conversation(self) -> Conversation:
+        """Get the conversation of the latest synchronous run, kept for inspection
+
+        Before the first run, it's an initialized conversation created on first
+        access, so that decorating a function doesn't have to build one.
+
+        Returns:
+            Conversation: The conversation
+        """
+        if self._conversation is None:
+            self._conversation = self._new_conversation()
+        return self._conversation
+
+    def _new_conversation(self) -> Conversation:
+        """Create a separate, initialized conversation for a single run, so that
+        several runs, in threads or coroutines, can go on at the same time
+
+        The runs share the skills of `conversation`, so skills and functions added
+        to it stay available.
+
+        Returns:
+            Conversation: The conversation
+        """
+        conversation = Conversation(
+            model=self.config.model, engine=self.config.engine, cache=self.config.cache
+        )
+        if self._conversation is None:
+            conversation.add_function(self.openai_function)
+        else:
+            conversation.skills = self._conversation.skills
+        if self._system_message is not None:
+            conversation.add_message(self._system_message)
+        return conversation
 
     def from_natural_language(self, prompt: str, retries: int | None = 1) -> Return:
         """Run the function with the given natural language input
@@ -96,8 +137,108 @@ class Wrapper(Generic[Param, Return]):
         Returns:
             The result of the original function
         """
-        self._initialize_conversation()
-        return self.conversation.run(self.openai_function.name, prompt, retries=retries)
+        conversation = self._conversation = self._new_conversation()
+        return conversation.run(self.openai_function.name, prompt, retries=retries)
+
+    async def afrom_natural_language(
+        self, prompt: str, retries: int | None = 1
+    ) -> Return:
+        """Run the function with the given natural language input asynchronously
+
+        Every call uses a conversation of its own, so calls can run concurrently.
+
+        Args:
+            prompt (str): The prompt to use
+            retries (int | None): The number of retries; if None, will retry
+                indefinitely
+
+        Returns:
+            The result of the original function
+        """
+        conversation = self._new_conversation()
+        return await conversation.arun(
+            self.openai_function.name, prompt, retries=retries
+        )
+
+    async def afrom_natural_language_batch(
+        self,
+        prompts: list[str],
+        retries: int | None = 1,
+        max_concurrency: int | None = None,
+    ) -> list[Return]:
+        """Run the function with each of the given natural language inputs, sending
+        the requests to OpenAI concurrently
+
+        Args:
+            prompts (list[str]): The prompts to use
+            retries (int | None): The number of retries for each prompt; if None,
+                will retry indefinitely
+            max_concurrency (int | None): The maximum number of requests in flight
+                at once, to stay within rate limits; unlimited if None
+
+        If any of the runs fails, the first error is raised once all of them have
+        finished.
+
+        Unless an aiohttp session has already been set with `openai.aiosession`,
+        one is opened for the batch, so the requests share their connections
+        instead of openai opening a new session for each of them.
+
+        Returns:
+            list: The results of the original function, in the order of the prompts
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or max(len(prompts), 1))
+
+        async def run(prompt: str) -> Return:
+            async with semaphore:
+                return await self.afrom_natural_language(prompt, retries)
+
+        async def run_all() -> list[Return]:
+            # Every run is let to settle before an error is raised, so none of
+            # them is left going on a session that is about to be closed
+            results = await asyncio.gather(
+                *(run(prompt) for prompt in prompts), return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            return results  # type: ignore
+
+        if openai.aiosession.get() is not None:
+            return await run_all()
+        # aiohttp comes with openai rather than being a dependency of its own
+        import aiohttp  # pylint: disable=import-outside-toplevel
+
+        async with aiohttp.ClientSession() as session:
+            token = openai.aiosession.set(session)
+            try:
+                return await run_all()
+            finally:
+                openai.aiosession.reset(token)
+
+    def from_natural_language_batch(
+        self,
+        prompts: list[str],
+        retries: int | None = 1,
+        max_concurrency: int | None = None,
+    ) -> list[Return]:
+        """Run the function with each of the given natural language inputs, sending
+        the requests to OpenAI concurrently; see `afrom_natural_language_batch`
+
+        Runs its own event loop, so it can't be called from a coroutine.
+
+        Args:
+            prompts (list[str]): The prompts to use
+            retries (int | None): The number of retries for each prompt; if None,
+                will retry indefinitely
+            max_concurrency (int | None): The maximum number of requests in flight
+                at once, to stay within rate limits; unlimited if None
+
+        Returns:
+            list: The results of the original function, in the order of the prompts
+        """
+        return asyncio.run(
+            self.afrom_natural_language_batch(prompts, retries, max_concurrency)
+        )
 
     def natural_language_response(self, prompt: str, retries: int | None = 1) -> str:
         """Run the function and respond to the user with natural language
@@ -110,12 +251,10 @@ class Wrapper(Generic[Param, Return]):
         Returns:
             str: The response from the AI
         """
-        self._initialize_conversation()
-        self.conversation.add_message(prompt)
-        self.conversation.generate_message(
-            function_call={"name": self.openai_function.name}
-        )
-        response = self.conversation.run_until_response(False, retries=retries)
+        conversation = self._conversation = self._new_conversation()
+        conversation.add_message(prompt)
+        conversation.generate_message(function_call={"name": self.openai_function.name})
+        response = conversation.run_until_response(False, retries=retries)
         return response.content
 
     def natural_language_annotated(
@@ -132,11 +271,11 @@ class Wrapper(Generic[Param, Return]):
         Returns:
             NaturalLanguageAnnotated: The response from the AI
         """
-        self._initialize_conversation()
-        function_result = self.conversation.run(
+        conversation = self._conversation = self._new_conversation()
+        function_result = conversation.run(
             self.openai_function.name, prompt, retries=retries
         )
-        response = self.conversation.run_until_response(False, retries=retries)
+        response = conversation.run_until_response(False, retries=retries)
         return NaturalLanguageAnnotated(function_result, response.content)
 
 
@@ -149,6 +288,7 @@ def _nlp(
     model: str = "gpt-3.5-turbo-0613",
     engine: str | None = None,
     serialize: bool = True,
+    cache: ResponseCache | None = None,
 ) -> Wrapper[Param, Return]:
     """Add natural language input to a function
 
@@ -160,6 +300,7 @@ def _nlp(
         name (str | None): The name override for the function.
         description (str | None): The description sent to OpenAI.
         serialize (bool): Whether to serialize the function result.
+        cache (ResponseCache | None): The cache for the responses from OpenAI.
 
     Returns:
         The function, with natural language input, or a decorator to add natural
@@ -174,6 +315,7 @@ def _nlp(
             name=name,
             description=description,
             serialize=serialize,
+            cache=cache,
         ),
     )
 
@@ -188,6 +330,7 @@ def nlp(
     system_prompt: str | None = None,
     model: str = "gpt-3.5-turbo-0613",
     engine: str | None = None,
+    cache: ResponseCache | None = None,
 ) -> Wrapper[Param, Return]:
     ...
 
@@ -201,6 +344,7 @@ def nlp(
     system_prompt: str | None = None,
     model: str = "gpt-3.5-turbo-0613",
     engine: str | None = None,
+    cache: ResponseCache | None = None,
 ) -> DecoratorProtocol:
     ...
 
@@ -214,6 +358,7 @@ def nlp(
     system_prompt: str | None = None,
     model: str = "gpt-3.5-turbo-0613",
     engine: str | None = None,
+    cache: ResponseCache | None = None,
 ) -> Wrapper[Param, Return] | DecoratorProtocol:
     """Add natural language input to a function
 
@@ -228,6 +373,8 @@ def nlp(
         system_prompt (str | None): The system prompt to use. Defaults to None.
         model (str): The model to use. Defaults to "gpt-3.5-turbo-0613".
         engine (str | None): The engine to use, for example, for Azure deployments.
+        cache (ResponseCache | None): The cache for the responses from OpenAI; if
+            provided, identical requests are only sent once.
 
     Returns:
         Wrapper | DecoratorProtocol: The function, with natural language input, or a
@@ -243,6 +390,7 @@ def nlp(
             system_prompt=system_prompt,
             model=model,
             engine=engine,
+            cache=cache,
         )
 
     return _nlp(
@@ -253,4 +401,5 @@ def nlp(
         system_prompt=system_prompt,
         model=model,
         engine=engine,
+        cache=cache,
     )
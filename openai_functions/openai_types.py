@@ -69,7 +69,21 @@ MessageType = Union[NonFunctionMessageType, FunctionMessageType]
 
 
 class Message:
-    """A container for OpenAI messages"""
+    """A container for OpenAI messages
+
+    The fields of the message are read once, on creation, so the message
+    dictionary must not be modified afterwards.
+    """
+
+    __slots__ = (
+        "message",
+        "_role",
+        "_content",
+        "_function_call",
+        "_is_function_call",
+        "_is_final_response",
+        "_hash",
+    )
 
     @overload
     def __init__(self, message: MessageType) -> None:
@@ -102,6 +116,18 @@ class Message:
             if "content" not in message:
                 message["content"] = None
             self.message = message
+        message = self.message
+        self._role = message["role"]
+        self._content = message["content"]
+        is_assistant = self._role == "assistant"
+        self._is_function_call = is_assistant and "function_call" in message
+        self._is_final_response = is_assistant and self._content is not None
+        self._function_call: FunctionCall | None = (
+            message.get("function_call")  # type: ignore
+            if is_assistant and self._content is None
+            else None
+        )
+        self._hash = hash((self._content, self._role))
 
     @property
     def content(self) -> str | None:
@@ -110,7 +136,7 @@ class Message:
         Returns:
             str | None: The content of the message
         """
-        return self.message["content"]
+        return self._content
 
     @property
     def role(self) -> Literal["system", "user", "assistant", "function"]:
@@ -119,7 +145,7 @@ class Message:
         Returns:
             Literal["system", "user", "assistant", "function"]: The role of the message
         """
-        return self.message["role"]
+        return self._role
 
     @property
     def is_function_call(self) -> bool:
@@ -128,7 +154,7 @@ class Message:
         Returns:
             bool: Whether the message is a function call
         """
-        return self.role == "assistant" and "function_call" in self.message
+        return self._is_function_call
 
     @property
     def function_call(self) -> FunctionCall | None:
@@ -137,11 +163,7 @@ class Message:
         Returns:
             FunctionCall | None: The function call
         """
-        if self.message["role"] == "assistant":
-            if self.message.get("content") is not None:
-                return None
-            return self.message.get("function_call")  # type: ignore
-        return None
+        return self._function_call
 
     @property
     def is_final_response(self) -> bool:
@@ -150,7 +172,7 @@ class Message:
         Returns:
             bool: Whether the message is a final response
         """
-        return self.role == "assistant" and self.content is not None
+        return self._is_final_response
 
     def as_dict(self) -> MessageType:
         """Get the message as a dictionary
@@ -161,20 +183,20 @@ class Message:
         return self.message
 
     def __repr__(self) -> str:
-        if self.is_function_call:
-            return f"FunctionCall({self.function_call!r})"
-        return f"Message({self.message['content']!r}, {self.message['role']!r})"
+        if self._is_function_call:
+            return f"FunctionCall({self._function_call!r})"
+        return f"Message({self._content!r}, {self._role!r})"
 
     def __eq__(self, other: object) -> bool:
         return (
             isinstance(other, Message)
-            and self.content == other.content
-            and self.role == other.role
-            and self.function_call == other.function_call
+            and self._content == other._content
+            and self._role == other._role
+            and self._function_call == other._function_call
         )
 
     def __hash__(self) -> int:
-        return hash((self.content, self.role))
+        return self._hash
 
 
 @runtime_checkable
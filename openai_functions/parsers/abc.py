@@ -1,7 +1,8 @@
 """Abstract base class for argument schema parsers"""
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Any, Generic, TYPE_CHECKING, Type, TypeVar
+from functools import lru_cache
+from typing import Any, ClassVar, Generic, Iterable, TYPE_CHECKING, Type, TypeVar
 
 from ..exceptions import CannotParseTypeError
 
@@ -20,6 +21,11 @@ class ArgSchemaParser(ABC, Generic[T]):
     from JSON.
     """
 
+    # The python types of the JSON values this parser may accept; None if it may
+    # accept values of any type. Used by UnionParser to pick an arm by the type of
+    # the value instead of trying each arm in turn.
+    value_types: ClassVar[tuple[type, ...] | None] = None
+
     def __init__(
         self, argtype: Type[T], rec_parsers: list[Type[ArgSchemaParser]]
     ) -> None:
@@ -38,10 +44,7 @@ class ArgSchemaParser(ABC, Generic[T]):
         Raises:
             CannotParseTypeError: If the type cannot be parsed
         """
-        for parser in self.rec_parsers:
-            if parser.can_parse(argtype):
-                return parser(argtype, self.rec_parsers)
-        raise CannotParseTypeError(argtype)
+        return find_parser(argtype, self.rec_parsers)(argtype, self.rec_parsers)
 
     @classmethod
     @abstractmethod
@@ -67,3 +70,72 @@ class ArgSchemaParser(ABC, Generic[T]):
         Raises:
             BrokenSchemaError: If the value does not match the schema
         """
+
+
+def find_parser(
+    argtype: Any, parsers: list[Type[ArgSchemaParser]]
+) -> Type[ArgSchemaParser]:
+    """Find the first parser that can parse a type
+
+    The result is memoized per type and list of parsers, so the `can_parse`
+    checks only run once for every distinct annotation.
+
+    Args:
+        argtype (Any): The type to parse
+        parsers (list[Type[ArgSchemaParser]]): The parsers to choose from, in order
+
+    Returns:
+        Type[ArgSchemaParser]: The parser class for the type
+
+    Raises:
+        CannotParseTypeError: If none of the parsers can parse the type
+    """
+    try:
+        return _find_parser_cached((type(argtype), argtype), tuple(parsers))
+    except TypeError:
+        # Unhashable annotations can't be memoized
+        return _find_parser_uncached(argtype, parsers)
+
+
+def _find_parser_uncached(
+    argtype: Any, parsers: Iterable[Type[ArgSchemaParser]]
+) -> Type[ArgSchemaParser]:
+    """Find the first parser that can parse a type, without memoization
+
+    Args:
+        argtype (Any): The type to parse
+        parsers (Iterable[Type[ArgSchemaParser]]): The parsers to choose from
+
+    Returns:
+        Type[ArgSchemaParser]: The parser class for the type
+
+    Raises:
+        CannotParseTypeError: If none of the parsers can parse the type
+    """
+    for parser in parsers:
+        if parser.can_parse(argtype):
+            return parser
+    raise CannotParseTypeError(argtype)
+
+
+@lru_cache(maxsize=1024)
+def _find_parser_cached(
+    key: tuple[type, Any], parsers: tuple[Type[ArgSchemaParser], ...]
+) -> Type[ArgSchemaParser]:
+    """Find the first parser that can parse a type, memoized
+
+    Annotations that compare equal may still be accepted by different parsers -
+    `Optional[int] == int | None`, but only the former is a `typing.Union` - so
+    the class of the annotation is a part of the key.
+
+    Args:
+        key (tuple[type, Any]): The class of the type to parse, and the type itself
+        parsers (tuple[Type[ArgSchemaParser], ...]): The parsers to choose from
+
+    Returns:
+        Type[ArgSchemaParser]: The parser class for the type
+
+    Raises:
+        CannotParseTypeError: If none of the parsers can parse the type
+    """
+    return _find_parser_uncached(key[1], parsers)
@@ -7,3 +7,4 @@ class BoolParser(AtomicParser[bool]):
 
     _type = bool
     schema_type_name: str = "boolean"
+    value_types = (bool,)
@@ -20,6 +20,17 @@ class IsDataclass(Protocol):  # pylint: disable=too-few-public-methods
 class DataclassParser(ArgSchemaParser[IsDataclass]):
     """Parser for dataclass types"""
 
+    value_types = (dict,)
+
+    def __init__(
+        self, argtype: Type[IsDataclass], rec_parsers: list[Type[ArgSchemaParser]]
+    ) -> None:
+        super().__init__(argtype, rec_parsers)
+        self._field_parsers: dict[str, ArgSchemaParser] = {
+            field.name: self.parse_rec(field.type)
+            for field in dataclasses.fields(argtype)
+        }
+
     @classmethod
     def can_parse(cls, argtype: Any) -> TypeGuard[Type[IsDataclass]]:
         return dataclasses.is_dataclass(argtype)
@@ -45,8 +56,7 @@ class DataclassParser(ArgSchemaParser[IsDataclass]):
             dict[str, JsonType]: The fields of the dataclass
         """
         return {
-            field.name: self.parse_rec(field.type).argument_schema
-            for field in dataclasses.fields(self.argtype)
+            name: parser.argument_schema for name, parser in self._field_parsers.items()
         }
 
     @property
@@ -63,12 +73,12 @@ class DataclassParser(ArgSchemaParser[IsDataclass]):
             raise BrokenSchemaError(value, self.argument_schema)
         if not all(field in value for field in self.required_fields):
             raise BrokenSchemaError(value, self.argument_schema)
-        if not all(field in self.fields for field in value):
+        if not all(field in self._field_parsers for field in value):
             raise BrokenSchemaError(value, self.argument_schema)
         return self.argtype(
             **{
-                field.name: self.parse_rec(field.type).parse_value(value[field.name])
-                for field in dataclasses.fields(self.argtype)
-                if field.name in value
+                name: parser.parse_value(value[name])
+                for name, parser in self._field_parsers.items()
+                if name in value
             }
         )
@@ -15,6 +15,14 @@ T = TypeVar("T")
 class DictParser(ArgSchemaParser[Dict[str, T]]):
     """Parser for dict types"""
 
+    value_types = (dict,)
+
+    def __init__(
+        self, argtype: Type[Dict[str, T]], rec_parsers: list[Type[ArgSchemaParser]]
+    ) -> None:
+        super().__init__(argtype, rec_parsers)
+        self._value_parser: ArgSchemaParser[T] = self.parse_rec(get_args(argtype)[1])
+
     @classmethod
     def can_parse(cls, argtype: Any) -> TypeGuard[Type[Dict[str, T]]]:
         return (
@@ -30,15 +38,11 @@ class DictParser(ArgSchemaParser[Dict[str, T]]):
     def argument_schema(self) -> Dict[str, JsonType]:
         return {
             "type": "object",
-            "additionalProperties": self.parse_rec(
-                get_args(self.argtype)[1]
-            ).argument_schema,
+            "additionalProperties": self._value_parser.argument_schema,
         }
 
     def parse_value(self, value: JsonType) -> Dict[str, T]:
         if not isinstance(value, dict):
             raise BrokenSchemaError(value, self.argument_schema)
-        return {
-            k: self.parse_rec(get_args(self.argtype)[1]).parse_value(v)
-            for k, v in value.items()
-        }
+        parse_value = self._value_parser.parse_value
+        return {k: parse_value(v) for k, v in value.items()}
@@ -16,6 +16,8 @@ T = TypeVar("T", bound=enum.Enum)
 class EnumParser(ArgSchemaParser[T]):
     """Parser for enum types"""
 
+    value_types = (str,)
+
     @classmethod
     def can_parse(cls, argtype: Any) -> TypeGuard[Type[T]]:
         if not isinstance(argtype, type):
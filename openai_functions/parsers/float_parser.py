@@ -14,6 +14,7 @@ class FloatParser(AtomicParser[float]):
 
     _type = float
     schema_type_name: str = "number"
+    value_types = (float, int, bool)
 
     def parse_value(self, value: JsonType) -> float:
         if not isinstance(value, (float, int)):
@@ -14,6 +14,7 @@ class IntParser(AtomicParser[int]):
 
     _type = int
     schema_type_name: str = "integer"
+    value_types = (int,)
 
     def parse_value(self, value: JsonType) -> int:
         if isinstance(value, bool):
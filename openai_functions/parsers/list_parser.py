@@ -15,6 +15,14 @@ T = TypeVar("T")
 class ListParser(ArgSchemaParser[List[T]]):
     """Parser for list types"""
 
+    value_types = (list,)
+
+    def __init__(
+        self, argtype: Type[List[T]], rec_parsers: list[Type[ArgSchemaParser]]
+    ) -> None:
+        super().__init__(argtype, rec_parsers)
+        self._item_parser: ArgSchemaParser[T] = self.parse_rec(get_args(argtype)[0])
+
     @classmethod
     def can_parse(cls, argtype: Any) -> TypeGuard[Type[List[T]]]:
         return get_origin(argtype) in [
@@ -26,10 +34,10 @@ class ListParser(ArgSchemaParser[List[T]]):
     def argument_schema(self) -> dict[str, JsonType]:
         return {
             "type": "array",
-            "items": self.parse_rec(get_args(self.argtype)[0]).argument_schema,
+            "items": self._item_parser.argument_schema,
         }
 
     def parse_value(self, value: JsonType) -> List[T]:
         if not isinstance(value, list):
             raise BrokenSchemaError(value, self.argument_schema)
-        return [self.parse_rec(get_args(self.argtype)[0]).parse_value(v) for v in value]
+        return list(map(self._item_parser.parse_value, value))
@@ -13,6 +13,8 @@ if TYPE_CHECKING:
 class NoneParser(ArgSchemaParser[None]):
     """Parser for null types"""
 
+    value_types = (type(None),)
+
     @classmethod
     def can_parse(cls, argtype: Any) -> TypeGuard[Type[None]]:
         return argtype in [None, type(None)]
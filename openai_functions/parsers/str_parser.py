@@ -7,3 +7,4 @@ class StringParser(AtomicParser[str]):
 
     _type = str
     schema_type_name: str = "string"
+    value_types = (str,)
@@ -28,18 +28,48 @@ if TYPE_CHECKING:
 class UnionParser(ArgSchemaParser[UnionType]):
     """Parser for union types"""
 
+    def __init__(
+        self, argtype: Type[UnionType], rec_parsers: list[Type[ArgSchemaParser]]
+    ) -> None:
+        super().__init__(argtype, rec_parsers)
+        self._arm_parsers: tuple[ArgSchemaParser, ...] = tuple(
+            self.parse_rec(t) for t in get_args(argtype)
+        )
+        self._parsers_by_value_type = self._build_value_type_dispatch()
+
+    def _build_value_type_dispatch(self) -> dict[type, ArgSchemaParser]:
+        """Map the types of JSON values to the only arm that can accept them
+
+        Value types accepted by several arms are left out, as the order of the
+        arms decides which one parses them.
+
+        Returns:
+            dict[type, ArgSchemaParser]: The arm parser for each value type
+        """
+        claims: dict[type, list[ArgSchemaParser]] = {}
+        for parser in self._arm_parsers:
+            if parser.value_types is None:
+                return {}
+            for value_type in parser.value_types:
+                claims.setdefault(value_type, []).append(parser)
+        return {
+            value_type: parsers[0]
+            for value_type, parsers in claims.items()
+            if len(parsers) == 1
+        }
+
     @classmethod
     def can_parse(cls, argtype: Any) -> TypeGuard[Type[UnionType]]:
         return get_origin(argtype) is Union
 
     @property
     def argument_schema(self) -> dict[str, JsonType]:
-        return {
-            "anyOf": [self.parse_rec(t).argument_schema for t in get_args(self.argtype)]
-        }
+        return {"anyOf": [parser.argument_schema for parser in self._arm_parsers]}
 
     def parse_value(self, value: JsonType) -> UnionType:
-        for single_type in get_args(self.argtype):
+        arm_parser = self._parsers_by_value_type.get(type(value))
+        candidates = self._arm_parsers if arm_parser is None else (arm_parser,)
+        for parser in candidates:
             with contextlib.suppress(BrokenSchemaError):
-                return self.parse_rec(single_type).parse_value(value)
+                return parser.parse_value(value)
         raise BrokenSchemaError(value, self.argument_schema)
@@ -7,6 +7,7 @@ import pytest
 
 from openai_functions import (
     BasicFunctionSet,
+    CannotParseTypeError,
     FunctionCall,
     FunctionNotFoundError,
     InvalidJsonError,
@@ -91,6 +92,25 @@ def test_run_function() -> None:
     assert result.interpret_return_as_response is False
 
 
+def test_run_function_arguments_not_shared() -> None:
+    function_set = BasicFunctionSet(
+        [
+            MockOpenAIFunction(
+                name="test_function",
+                schema={"type": "object", "properties": {"limit": {"type": "integer"}}},
+                function=lambda args: args.pop("limit", 10),
+                save_return=True,
+                serialize=True,
+                remove_call=False,
+                interpret_as_response=False,
+            )
+        ]
+    )
+    call: FunctionCall = {"name": "test_function", "arguments": '{"limit": 3}'}
+    assert function_set.run_function(call).result == 3
+    assert function_set.run_function(call).result == 3
+
+
 def test_run_function_invalid_json() -> None:
     functions = [
         MockOpenAIFunction(
@@ -210,3 +230,129 @@ def test_remove_function() -> None:
     function_set = BasicFunctionSet(functions=functions)
     function_set.remove_function("test_function")
     assert function_set.functions == []
+
+
+def test_find_function_after_add_and_remove() -> None:
+    function_set = BasicFunctionSet()
+    first = MockOpenAIFunction(
+        name="test_function",
+        schema={"type": "object", "properties": {}},
+        function=lambda args: "first",
+        save_return=True,
+        serialize=False,
+        remove_call=False,
+        interpret_as_response=False,
+    )
+    second = MockOpenAIFunction(
+        name="test_function",
+        schema={"type": "object", "properties": {}},
+        function=lambda args: "second",
+        save_return=True,
+        serialize=False,
+        remove_call=False,
+        interpret_as_response=False,
+    )
+    function_set.add_function(first)
+    function_set.add_function(second)
+    assert function_set.find_function("test_function") is first
+    function_set.remove_function("test_function")
+    with pytest.raises(FunctionNotFoundError):
+        function_set.find_function("test_function")
+    function_set.add_function(second)
+    assert function_set.find_function("test_function") is second
+
+
+def test_functions_schema_follows_add_and_remove() -> None:
+    function_set = BasicFunctionSet()
+    function = MockOpenAIFunction(
+        name="test_function",
+        schema={"name": "test_function"},
+        function=lambda args: None,
+        save_return=True,
+        serialize=False,
+        remove_call=False,
+        interpret_as_response=False,
+    )
+    assert function_set.functions_schema == []
+    function_set.add_function(function)
+    assert function_set.functions_schema == [{"name": "test_function"}]
+    assert function_set.functions_schema is function_set.functions_schema
+    function_set.remove_function("test_function")
+    assert function_set.functions_schema == []
+
+
+def test_direct_changes_to_functions() -> None:
+    def make_function(name: str) -> MockOpenAIFunction:
+        return MockOpenAIFunction(
+            name=name,
+            schema={"name": name},
+            function=lambda args: None,
+            save_return=True,
+            serialize=False,
+            remove_call=False,
+            interpret_as_response=False,
+        )
+
+    functions = [make_function("first")]
+    function_set = BasicFunctionSet(functions)
+    functions.append(make_function("ignored"))
+    assert function_set.functions_schema == [{"name": "first"}]
+    with pytest.raises(FunctionNotFoundError):
+        function_set.find_function("ignored")
+
+    second = make_function("second")
+    function_set.functions.append(second)
+    assert function_set.functions_schema == [{"name": "first"}, {"name": "second"}]
+    assert function_set.find_function("second") is second
+    function_set.functions.pop()
+    assert function_set.functions_schema == [{"name": "first"}]
+    with pytest.raises(FunctionNotFoundError):
+        function_set.find_function("second")
+    function_set.functions[0] = second
+    assert function_set.functions_schema == [{"name": "second"}]
+    with pytest.raises(FunctionNotFoundError):
+        function_set.find_function("first")
+
+
+def test_functions_schema_built_once_per_function() -> None:
+    schema_builds: list[str] = []
+
+    class CountingFunction(MockOpenAIFunction):
+        @property  # type: ignore
+        def schema(self) -> JsonType:
+            schema_builds.append(self.name)
+            return {"name": self.name}
+
+        @schema.setter
+        def schema(self, value: JsonType) -> None:
+            pass
+
+    def make_function(name: str) -> CountingFunction:
+        return CountingFunction(
+            name=name,
+            schema=None,
+            function=lambda args: None,
+            save_return=True,
+            serialize=False,
+            remove_call=False,
+            interpret_as_response=False,
+        )
+
+    function_set = BasicFunctionSet([make_function("first"), make_function("second")])
+    assert function_set.functions_schema == [{"name": "first"}, {"name": "second"}]
+    schema_builds.clear()
+    function_set.add_function(make_function("third"))
+    function_set.remove_function("first")
+    assert function_set.functions_schema == [{"name": "second"}, {"name": "third"}]
+    assert "second" not in schema_builds
+
+
+def test_add_function_rejects_unparseable_arguments() -> None:
+    function_set = BasicFunctionSet()
+
+    def test_function(arg1: object) -> None:
+        """Test function."""
+
+    with pytest.raises(CannotParseTypeError):
+        function_set.add_function(test_function)
+    assert function_set.functions == []
@@ -1,6 +1,13 @@
-from unittest.mock import MagicMock
+import asyncio
+import json
+import threading
+from unittest.mock import AsyncMock, MagicMock
 
-from openai_functions import Conversation, Message
+import openai
+import pytest
+
+from openai_functions import BrokenSchemaError, Conversation, InMemoryCache, Message
+from openai_functions.completions import parse_retry_time
 
 
 def test_add_function():
@@ -49,3 +56,369 @@ def test_run():
         {"name": "test_function", "args": {"test": "test"}}
     )
     assert result == "Test Result"
+
+
+def test_arun_until_response():
+    conversation = Conversation()
+
+    @conversation.add_function
+    def get_weather(city: str) -> str:
+        """Get the weather"""
+        return f"Sunny in {city}"
+
+    conversation._agenerate_raw_message = AsyncMock(
+        side_effect=[
+            {
+                "choices": [
+                    {
+                        "message": {
+                            "role": "assistant",
+                            "content": None,
+                            "function_call": {
+                                "name": "get_weather",
+                                "arguments": '{"city": "Kyiv"}',
+                            },
+                        }
+                    }
+                ]
+            },
+            {"choices": [{"message": {"role": "assistant", "content": "Sunny!"}}]},
+        ]
+    )
+    conversation.add_message("What's the weather in Kyiv?")
+    response = asyncio.run(conversation.arun_until_response())
+    assert response.content == "Sunny!"
+    assert conversation.messages[2] == Message(
+        {"role": "function", "name": "get_weather", "content": '"Sunny in Kyiv"'}
+    )
+
+
+def test_message_dicts():
+    conversation = Conversation()
+    conversation.add_messages(["Hi", Message("Hello!", "assistant"), "Bye"])
+    conversation.pop_message(0)
+    assert conversation.message_dicts == [
+        {"role": "assistant", "content": "Hello!"},
+        {"role": "user", "content": "Bye"},
+    ]
+    conversation.messages.insert(0, Message("Be nice", "system"))
+    conversation.add_message("Hi again")
+    assert conversation.message_dicts == [
+        message.as_dict() for message in conversation.messages
+    ]
+    conversation.messages[0] = Message("Be brief", "system")
+    assert conversation.message_dicts[0] == {"role": "system", "content": "Be brief"}
+    conversation.messages = [Message("x"), Message("y")]
+    assert conversation.message_dicts == [
+        {"role": "user", "content": "x"},
+        {"role": "user", "content": "y"},
+    ]
+    conversation.clear_messages()
+    assert conversation.message_dicts == []
+
+
+def test_add_messages_goes_through_add_message():
+    added = []
+
+    class RecordingConversation(Conversation):
+        def _add_message(self, message):
+            added.append(message)
+            super()._add_message(message)
+
+    conversation = RecordingConversation()
+    conversation.add_messages(["Hi", Message("Hello!", "assistant")])
+    assert added == conversation.messages
+    assert len(added) == 2
+
+
+def test_aask_concurrently():
+    async def answer(question: str) -> str:
+        conversation = Conversation()
+        conversation.agenerate_message = AsyncMock(
+            return_value=Message(f"Answer to {question}", "assistant")
+        )
+        return await conversation.aask(question)
+
+    async def ask_all() -> list:
+        return await asyncio.gather(answer("A"), answer("B"))
+
+    assert asyncio.run(ask_all()) == ["Answer to A", "Answer to B"]
+
+
+def test_arun():
+    conversation = Conversation()
+    conversation.agenerate_message = AsyncMock(
+        return_value=Message(
+            {
+                "role": "assistant",
+                "content": None,
+                "function_call": {"name": "test_function", "arguments": "{}"},
+            },
+        )
+    )
+    conversation.skills = MagicMock(return_value="Test Result")
+    result = asyncio.run(conversation.arun("test_function", "Run it"))
+    conversation.skills.assert_called_once_with(
+        {"name": "test_function", "arguments": "{}"}
+    )
+    assert result == "Test Result"
+
+
+def test_arun_function_if_needed_runs_functions_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def make_conversation() -> Conversation:
+        conversation = Conversation()
+
+        @conversation.add_function
+        def wait_for_the_other() -> str:
+            """Wait until both conversations are running a function"""
+            barrier.wait()
+            return "done"
+
+        conversation.add_message(
+            {
+                "role": "assistant",
+                "content": None,
+                "function_call": {"name": "wait_for_the_other", "arguments": "{}"},
+            }
+        )
+        return conversation
+
+    async def run_both() -> list:
+        return await asyncio.gather(
+            make_conversation().arun_function_if_needed(),
+            make_conversation().arun_function_if_needed(),
+        )
+
+    assert asyncio.run(run_both()) == [True, True]
+
+
+def test_agenerate_message_uses_aiosession(monkeypatch):
+    session = MagicMock()
+    sessions_used = []
+
+    async def acreate(**kwargs):
+        sessions_used.append(openai.aiosession.get())
+        return {"choices": [{"message": {"role": "assistant", "content": "Hi"}}]}
+
+    monkeypatch.setattr(openai.ChatCompletion, "acreate", acreate)
+    conversation = Conversation(aiosession=session)
+    conversation.add_message("Hello")
+    asyncio.run(conversation.agenerate_message())
+    assert sessions_used == [session]
+    assert openai.aiosession.get() is None
+
+
+def test_remove_call_replaces_function_call():
+    conversation = Conversation()
+
+    @conversation.add_function(remove_call=True)
+    def get_answer() -> int:
+        """Get the answer"""
+        return 42
+
+    conversation.add_messages(
+        [
+            "What's the answer?",
+            {
+                "role": "assistant",
+                "content": None,
+                "function_call": {"name": "get_answer", "arguments": "{}"},
+            },
+        ]
+    )
+    assert conversation.run_function_if_needed()
+    assert conversation.message_dicts == [
+        {"role": "user", "content": "What's the answer?"},
+        {"role": "function", "name": "get_answer", "content": "42"},
+    ]
+    assert conversation.messages[-1] == Message(conversation.message_dicts[-1])
+
+
+def test_parse_retry_time():
+    assert parse_retry_time("1s") == 1
+    assert parse_retry_time("6m0s") == 360
+    assert parse_retry_time("1h2.5s") == 3602.5
+    assert parse_retry_time("20ms") == 0.02
+    with pytest.raises(ValueError):
+        parse_retry_time("soon")
+
+
+def test_retries_transient_errors(monkeypatch):
+    sleeps = []
+    responses = [
+        openai.error.APIConnectionError("Connection reset"),
+        openai.error.RateLimitError(
+            "Slow down",
+            headers={
+                "x-ratelimit-reset-requests": "1s",
+                "x-ratelimit-limit-requests": "2",
+            },
+        ),
+        {"choices": [{"message": {"role": "assistant", "content": "Hi!"}}]},
+    ]
+
+    def create(**kwargs):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(openai.ChatCompletion, "create", create)
+    monkeypatch.setattr("time.sleep", sleeps.append)
+    conversation = Conversation()
+    assert conversation.ask("Hello", retries=2) == "Hi!"
+    assert 0 <= sleeps[0] <= 1
+    assert 0.5 <= sleeps[1] <= 0.55
+
+    monkeypatch.setattr(
+        openai.ChatCompletion,
+        "create",
+        MagicMock(side_effect=openai.error.InvalidRequestError("Bad", None)),
+    )
+    with pytest.raises(openai.error.InvalidRequestError):
+        conversation.ask("Hello", retries=2)
+    assert len(sleeps) == 2
+
+
+def test_response_cache(monkeypatch):
+    create = MagicMock(
+        return_value={
+            "choices": [{"message": {"role": "assistant", "content": "Hello!"}}]
+        }
+    )
+    monkeypatch.setattr(openai.ChatCompletion, "create", create)
+    cache = InMemoryCache()
+    for _ in range(2):
+        conversation = Conversation(cache=cache)
+        assert conversation.ask("Hi") == "Hello!"
+    create.assert_called_once()
+    conversation = Conversation(cache=cache, model="gpt-4-0613")
+    conversation.ask("Hi")
+    assert create.call_count == 2
+
+    acreate = AsyncMock()
+    monkeypatch.setattr(openai.ChatCompletion, "acreate", acreate)
+    conversation = Conversation(cache=cache)
+    assert asyncio.run(conversation.aask("Hi")) == "Hello!"
+    acreate.assert_not_called()
+
+
+def test_generate_message_stream(monkeypatch):
+    chunks = [
+        {"choices": []},
+        {"choices": [{"delta": {"role": "assistant", "content": None}}]},
+        {"choices": [{"delta": {"function_call": {"name": "get_weather"}}}]},
+        {"choices": [{"delta": {"function_call": {"arguments": '{"city": '}}}]},
+        {"choices": [{"delta": {"function_call": {"arguments": '"Kyiv"}'}}}]},
+        {"choices": [{"delta": {}}]},
+    ]
+    monkeypatch.setattr(
+        openai.ChatCompletion, "create", MagicMock(return_value=iter(chunks))
+    )
+    conversation = Conversation()
+    conversation.skills.prewarm = MagicMock()
+    conversation.add_message("What's the weather in Kyiv?")
+    message = conversation.generate_message(stream=True)
+    conversation.skills.prewarm.assert_called_once_with("get_weather")
+    assert message.function_call == {
+        "name": "get_weather",
+        "arguments": '{"city": "Kyiv"}',
+    }
+    assert conversation.messages[-1] == message
+
+
+def test_generate_message_stream_split_name(monkeypatch):
+    chunks = [
+        {"choices": [{"delta": {"function_call": {"name": "get_", "arguments": ""}}}]},
+        {"choices": [{"delta": {"function_call": {"name": "weather"}}}]},
+        {"choices": [{"delta": {"function_call": {"arguments": "{}"}}}]},
+        {"choices": [{"delta": {}, "finish_reason": "function_call"}]},
+    ]
+    monkeypatch.setattr(
+        openai.ChatCompletion, "create", MagicMock(return_value=iter(chunks))
+    )
+    conversation = Conversation()
+    conversation.skills.prewarm = MagicMock()
+    message = conversation.generate_message(stream=True)
+    conversation.skills.prewarm.assert_called_once_with("get_weather")
+    assert message.function_call == {"name": "get_weather", "arguments": "{}"}
+
+
+def test_ask_many(monkeypatch):
+    def create(**kwargs):
+        assert kwargs["function_call"] == {"name": "answer_questions"}
+        questions = kwargs["messages"][-1]["content"].splitlines()[2:]
+        answers = [question.split(": ")[1].upper() for question in questions]
+        return {
+            "choices": [
+                {
+                    "message": {
+                        "role": "assistant",
+                        "content": None,
+                        "function_call": {
+                            "name": "answer_questions",
+                            "arguments": json.dumps({"answers": answers}),
+                        },
+                    }
+                }
+            ]
+        }
+
+    monkeypatch.setattr(openai.ChatCompletion, "create", create)
+    conversation = Conversation()
+    assert conversation.ask_many(["a", "b", "c"], batch_size=2) == ["A", "B", "C"]
+    assert conversation.functions_schema == []
+    assert conversation.message_dicts[0]["content"] == (
+        "Answer each of the following 2 questions, in order:\n\nQ1: a\nQ2: b"
+    )
+    assert conversation.message_dicts[-1] == {
+        "role": "function",
+        "name": "answer_questions",
+        "content": '["C"]',
+    }
+
+
+def test_ask_many_keeps_user_functions():
+    conversation = Conversation()
+
+    @conversation.add_function
+    def answer_questions(answers: str) -> str:
+        """A function of the user's"""
+        return answers
+
+    with pytest.raises(ValueError):
+        conversation.ask_many(["a"])
+    assert [schema["name"] for schema in conversation.functions_schema] == [
+        "answer_questions"
+    ]
+
+
+def test_ask_many_broken_answers(monkeypatch):
+    monkeypatch.setattr(
+        openai.ChatCompletion,
+        "create",
+        MagicMock(
+            return_value={
+                "choices": [
+                    {
+                        "message": {
+                            "role": "assistant",
+                            "content": None,
+                            "function_call": {
+                                "name": "answer_questions",
+                                "arguments": '{"answers": ["A"]}',
+                            },
+                        }
+                    }
+                ]
+            }
+        ),
+    )
+    conversation = Conversation()
+    conversation.add_message("Hi")
+    with pytest.raises(BrokenSchemaError):
+        conversation.ask_many(["a", "b"])
+    assert conversation.message_dicts == [{"role": "user", "content": "Hi"}]
+    assert conversation.functions_schema == []
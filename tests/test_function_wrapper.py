@@ -2,11 +2,15 @@
 
 from dataclasses import dataclass
 import enum
-from typing import Dict, List, Union
+import sys
+from typing import Dict, List, Optional, Union
 
 import pytest
 
 from openai_functions import BrokenSchemaError, CannotParseTypeError, FunctionWrapper
+from openai_functions.parsers import defargparsers
+from openai_functions.parsers.abc import _find_parser_cached, find_parser
+from openai_functions.parsers.union_parser import UnionParser
 
 
 def test_function_schema_generation_empty():
@@ -445,3 +449,68 @@ def test_none():
         },
     }
     function_wrapper({"container": None})
+
+
+def test_changing_a_schema_leaves_other_schemas_alone():
+    """Test that the schemas handed out by the parsers aren't shared"""
+
+    def test_function(number: int, nothing: None, items: List[int]):
+        """Test function docstring."""
+
+    schema = FunctionWrapper(test_function).schema
+    properties = schema["parameters"]["properties"]
+    properties["number"]["minimum"] = 0
+    properties["nothing"]["nullable"] = True
+    properties["items"]["items"]["maximum"] = 9
+
+    assert FunctionWrapper(test_function).schema["parameters"]["properties"] == {
+        "number": {"type": "integer"},
+        "nothing": {"type": "null"},
+        "items": {"type": "array", "items": {"type": "integer"}},
+    }
+
+
+def test_argument_parsers_are_reused():
+    """Test that the argument parsers are only resolved once"""
+
+    def test_function(param1: int, param2: List[str]):
+        """Test function docstring."""
+        return param1, param2
+
+    function_wrapper = FunctionWrapper(test_function)
+
+    assert function_wrapper.argument_parsers is function_wrapper.argument_parsers
+    assert function_wrapper({"param1": 1, "param2": ["a"]}) == (1, ["a"])
+    assert function_wrapper({"param1": 2, "param2": []}) == (2, [])
+
+
+def test_function_call_with_overlapping_union():
+    """Test that union arms accepting the same values keep their priority"""
+
+    def test_function(param1: Union[int, float], param2: Union[float, int, None]):
+        """Test function docstring."""
+        return param1, param2
+
+    function_wrapper = FunctionWrapper(test_function)
+
+    result = function_wrapper({"param1": 1, "param2": 1})
+    assert result == (1, 1.0)
+    assert isinstance(result[0], int)
+    assert isinstance(result[1], float)
+    assert function_wrapper({"param1": 1.5, "param2": None}) == (1.5, None)
+    assert function_wrapper({"param1": True, "param2": 2.5}) == (1.0, 2.5)
+    with pytest.raises(BrokenSchemaError):
+        function_wrapper({"param1": "test", "param2": None})
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="requires PEP 604 unions")
+@pytest.mark.parametrize("optional_first", [True, False])
+def test_find_parser_tells_equal_annotations_apart(optional_first: bool):
+    """Test that equal annotations of different kinds get their own parsers."""
+    pep604_optional = eval("int | None")  # pylint: disable=eval-used
+    _find_parser_cached.cache_clear()
+    if optional_first:
+        assert find_parser(Optional[int], defargparsers) is UnionParser
+    with pytest.raises(CannotParseTypeError):
+        find_parser(pep604_optional, defargparsers)
+    assert find_parser(Optional[int], defargparsers) is UnionParser
@@ -0,0 +1,169 @@
+import asyncio
+import json
+
+import openai
+import pytest
+
+from openai_functions import BasicFunctionSet, InMemoryCache, nlp
+
+
+def test_from_natural_language_batch(monkeypatch):
+    in_flight = 0
+    max_in_flight = 0
+    sessions = set()
+
+    async def acreate(**kwargs):
+        nonlocal in_flight, max_in_flight
+        sessions.add(openai.aiosession.get())
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        assert kwargs["messages"][0] == {"role": "system", "content": "Be brief."}
+        number = int(kwargs["messages"][-1]["content"])
+        return {
+            "choices": [
+                {
+                    "message": {
+                        "role": "assistant",
+                        "content": None,
+                        "function_call": {
+                            "name": "double",
+                            "arguments": json.dumps({"number": number}),
+                        },
+                    }
+                }
+            ]
+        }
+
+    monkeypatch.setattr(openai.ChatCompletion, "acreate", acreate)
+
+    @nlp(system_prompt="Be brief.")
+    def double(number: int) -> int:
+        """Double a number"""
+        return number * 2
+
+    prompts = [str(number) for number in range(5)]
+    assert double.from_natural_language_batch(prompts, max_concurrency=2) == [
+        0,
+        2,
+        4,
+        6,
+        8,
+    ]
+    assert max_in_flight == 2
+    assert len(sessions) == 1
+    assert None not in sessions
+    assert openai.aiosession.get() is None
+
+
+def test_from_natural_language_cache(monkeypatch):
+    requests = []
+
+    def create(**kwargs):
+        requests.append(kwargs)
+        return {
+            "choices": [
+                {
+                    "message": {
+                        "role": "assistant",
+                        "content": None,
+                        "function_call": {
+                            "name": "double",
+                            "arguments": '{"number": 2}',
+                        },
+                    }
+                }
+            ]
+        }
+
+    monkeypatch.setattr(openai.ChatCompletion, "create", create)
+
+    @nlp(cache=InMemoryCache())
+    def double(number: int) -> int:
+        """Double a number"""
+        return number * 2
+
+    assert double.from_natural_language("Two") == 4
+    assert double.from_natural_language("Two") == 4
+    assert len(requests) == 1
+
+
+def test_from_natural_language_batch_error(monkeypatch):
+    finished = []
+
+    async def acreate(**kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        if prompt == "fail":
+            raise openai.error.InvalidRequestError("Bad", None)
+        await asyncio.sleep(0.01)
+        finished.append(openai.aiosession.get().closed)
+        return {
+            "choices": [
+                {
+                    "message": {
+                        "role": "assistant",
+                        "content": None,
+                        "function_call": {
+                            "name": "double",
+                            "arguments": json.dumps({"number": int(prompt)}),
+                        },
+                    }
+                }
+            ]
+        }
+
+    monkeypatch.setattr(openai.ChatCompletion, "acreate", acreate)
+
+    @nlp
+    def double(number: int) -> int:
+        """Double a number"""
+        return number * 2
+
+    with pytest.raises(openai.error.InvalidRequestError):
+        double.from_natural_language_batch(["1", "fail", "2"])
+    assert finished == [False, False]
+
+
+def test_from_natural_language_keeps_skills(monkeypatch):
+    requests = []
+
+    def create(**kwargs):
+        requests.append(kwargs)
+        return {
+            "choices": [
+                {
+                    "message": {
+                        "role": "assistant",
+                        "content": None,
+                        "function_call": {
+                            "name": "double",
+                            "arguments": '{"number": 2}',
+                        },
+                    }
+                }
+            ]
+        }
+
+    monkeypatch.setattr(openai.ChatCompletion, "create", create)
+
+    @nlp
+    def double(number: int) -> int:
+        """Double a number"""
+        return number * 2
+
+    skill = BasicFunctionSet()
+
+    @skill.add_function
+    def halve(number: int) -> float:
+        """Halve a number"""
+        return number / 2
+
+    double.conversation.add_skill(skill)
+    assert double.from_natural_language("Two") == 4
+    assert double.from_natural_language("Two") == 4
+    for request in requests:
+        assert [function["name"] for function in request["functions"]] == [
+            "double",
+            "halve",
+        ]
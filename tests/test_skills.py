@@ -1,7 +1,13 @@
 """Test the skills."""
 import pytest
 
-from openai_functions import BasicFunctionSet, FunctionNotFoundError, FunctionWrapper
+from openai_functions import (
+    BasicFunctionSet,
+    FunctionNotFoundError,
+    FunctionWrapper,
+    TogglableSet,
+    UnionSkillSet,
+)
 
 
 def test_skills_functions():
@@ -68,3 +74,52 @@ def test_skills_functions():
     )
     with pytest.raises(FunctionNotFoundError):
         skills.run_function({"name": "invalid_function", "arguments": "{}"})
+
+
+def test_union_schema_follows_child_sets():
+    """Test that the union schema picks up changes made to its child sets."""
+    child = BasicFunctionSet()
+    union = UnionSkillSet(child)
+
+    @child.add_function
+    def first_function():
+        """First function."""
+
+    assert [schema["name"] for schema in union.functions_schema] == [
+        "first_function"
+    ]
+    assert union.functions_schema is union.functions_schema
+
+    @child.add_function
+    def second_function():
+        """Second function."""
+
+    assert [schema["name"] for schema in union.functions_schema] == [
+        "first_function",
+        "second_function",
+    ]
+
+
+def test_union_runs_function_in_owning_set():
+    """Test that the union dispatches calls to the set that has the function."""
+    first = BasicFunctionSet()
+    second = TogglableSet("enable_second")
+    union = UnionSkillSet(first, second)
+
+    @first.add_function
+    def first_function():
+        """First function."""
+        return "first"
+
+    @second.add_function
+    def second_function():
+        """Second function."""
+        return "second"
+
+    assert union({"name": "first_function", "arguments": "{}"}) == "first"
+    with pytest.raises(FunctionNotFoundError):
+        union({"name": "second_function", "arguments": "{}"})
+    union({"name": "enable_second", "arguments": "{}"})
+    assert union({"name": "second_function", "arguments": "{}"}) == "second"
+    with pytest.raises(FunctionNotFoundError):
+        union({"name": "missing_function", "arguments": "{}"})